@@ -0,0 +1 @@
+"""Benchmarks of graph construction, scheduling and execution overhead."""
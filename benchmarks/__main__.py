@@ -0,0 +1,185 @@
+"""Run benchmarks and write machine readable results.
+
+Usage::
+
+    python -m benchmarks --sizes 10 100 1000 --output bench.json
+    python -m benchmarks --compare bench.json --tolerance 0.25
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+from typing import Callable, List
+
+from benchmarks.graphs import SHAPES, generate
+from datagears.engine.backends import ProcessBackend
+from datagears.engine.engine import LocalEngine
+from datagears.engine.network import Network
+from datagears.engine.plan import ExecutionPlan
+from datagears.engine.pool import WorkerPool
+
+
+def measure(func: Callable, repeat: int) -> float:
+    """Best wall clock time of a number of repeats."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def run_suite(
+    sizes: List[int],
+    shapes: List[str],
+    repeat: int = 3,
+    process_limit: int = 1000,
+    duration: float = 1.0,
+) -> List[dict]:
+    """Run all benchmarks and return one record per measurement."""
+    graphs = {
+        (shape, size): generate(shape, size) for shape in shapes for size in sizes
+    }
+    small_outputs, small_inputs = generate("diamond", 8)
+    records = []
+
+    def record(benchmark: str, shape: str, size: int, seconds: float) -> None:
+        records.append(
+            {
+                "benchmark": benchmark,
+                "shape": shape,
+                "gears": size,
+                "seconds": seconds,
+                "per_gear_us": seconds / size * 1e6,
+            }
+        )
+
+    # NOTE: The pool is started after all graphs are generated so its workers
+    # find the generated gear modules on `sys.path`.
+    with WorkerPool() as pool:
+        pool.warmup()
+        backends = {
+            "inline": "inline",
+            "thread": "thread",
+            "process": ProcessBackend(pool),
+        }
+
+        for (shape, size), (outputs, inputs) in graphs.items():
+            build = lambda: Network(f"{shape}-{size}", outputs=outputs)  # noqa: E731
+            record("construction", shape, size, measure(build, repeat))
+
+            network = build()
+            record(
+                "compile", shape, size, measure(lambda: ExecutionPlan(network), repeat)
+            )
+
+            network.compile()
+            engine = LocalEngine(network, backend="inline")
+            record(
+                "schedule_inline",
+                shape,
+                size,
+                measure(lambda: engine.run(**inputs), repeat),
+            )
+
+            if size <= process_limit:
+                engine = LocalEngine(network, pool=pool, backend=backends["process"])
+                record(
+                    "dispatch_process",
+                    shape,
+                    size,
+                    measure(lambda: engine.run(**inputs), repeat),
+                )
+
+        network = Network("throughput", outputs=small_outputs)
+        for name, backend in backends.items():
+            engine = LocalEngine(network, pool=pool, backend=backend)
+            runs, start = 0, time.perf_counter()
+            while time.perf_counter() - start < duration:
+                engine.run(**small_inputs)
+                runs += 1
+
+            elapsed = time.perf_counter() - start
+            records.append(
+                {
+                    "benchmark": f"throughput_{name}",
+                    "shape": "diamond",
+                    "gears": 8,
+                    "seconds": elapsed / runs,
+                    "runs_per_second": runs / elapsed,
+                }
+            )
+
+    return records
+
+
+def compare(records: List[dict], baseline: List[dict], tolerance: float) -> List[str]:
+    """Returns descriptions of measurements slower than the baseline."""
+    key = lambda r: (r["benchmark"], r["shape"], r["gears"])  # noqa: E731
+    previous = {key(r): r["seconds"] for r in baseline}
+
+    regressions = []
+    for r in records:
+        before = previous.get(key(r))
+        if before and r["seconds"] > before * (1 + tolerance):
+            regressions.append(
+                f"{r['benchmark']}/{r['shape']}/{r['gears']}: "
+                f"{before:.6f}s -> {r['seconds']:.6f}s"
+            )
+
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    """Benchmark entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--shapes", nargs="+", default=list(SHAPES), choices=SHAPES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--process-limit",
+        type=int,
+        default=1000,
+        help="largest network dispatched to the process pool",
+    )
+    parser.add_argument(
+        "--duration", type=float, default=1.0, help="seconds per throughput run"
+    )
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON file to check against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    records = run_suite(
+        args.sizes, args.shapes, args.repeat, args.process_limit, args.duration
+    )
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": records,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(records, json.load(f)["results"], args.tolerance)
+
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
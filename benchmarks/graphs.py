@@ -0,0 +1,114 @@
+"""Synthetic networks for benchmarks.
+
+Gear functions are generated as source code and written as modules into a
+temporary directory on `sys.path`. Worker processes started afterwards import
+them by name, with both the fork and the spawn start method.
+"""
+
+import atexit
+import importlib
+import os
+import random
+import shutil
+import sys
+import tempfile
+from typing import Callable, Dict, List, Optional, Tuple
+
+Shape = Tuple[List[Callable], Dict[str, int]]
+
+SHAPES = ("chain", "fanout", "diamond", "layered")
+
+_modules_dir: Optional[str] = None
+
+
+def _modules_path() -> str:
+    """Directory of generated modules, created and put on `sys.path` on first use."""
+    global _modules_dir
+    if _modules_dir is None:
+        _modules_dir = tempfile.mkdtemp(prefix="datagears-bench-")
+        atexit.register(shutil.rmtree, _modules_dir, ignore_errors=True)
+        # NOTE: Spawned workers copy `sys.path` of the parent when they start.
+        sys.path.append(_modules_dir)
+
+    return _modules_dir
+
+
+def _build(name: str, deps: List[List[int]]) -> Shape:
+    """Create module with one gear per entry of the dependency lists."""
+    lines = ["from datagears.engine.network import Depends", ""]
+
+    for idx, parents in enumerate(deps):
+        if parents:
+            params = ", ".join(
+                f"x{pos}: int = Depends(g_{parent})"
+                for pos, parent in enumerate(parents)
+            )
+            body = " + ".join(f"x{pos}" for pos in range(len(parents)))
+        else:
+            params, body = "seed: int", "seed"
+
+        lines.append(f"def g_{idx}({params}) -> int:\n    return {body} + 1\n")
+
+    module_name = f"datagears_bench_{name}"
+    if module_name not in sys.modules:
+        path = os.path.join(_modules_path(), f"{module_name}.py")
+        with open(path, "w") as module_file:
+            module_file.write("\n".join(lines))
+
+        importlib.invalidate_caches()
+
+    module = importlib.import_module(module_name)
+
+    consumed = {parent for parents in deps for parent in parents}
+    outputs = [
+        getattr(module, f"g_{idx}") for idx in range(len(deps)) if idx not in consumed
+    ]
+    return outputs, {"seed": 1}
+
+
+def chain(size: int) -> Shape:
+    """Linear chain of gears."""
+    return _build(f"chain_{size}", [[]] + [[idx] for idx in range(size - 1)])
+
+
+def fanout(size: int) -> Shape:
+    """A single source feeding every other gear, all of them outputs."""
+    return _build(f"fanout_{size}", [[]] + [[0] for _ in range(size - 1)])
+
+
+def diamond(size: int) -> Shape:
+    """Stacked diamonds, each splitting into two branches joined again."""
+    deps: List[List[int]] = [[]]
+    while len(deps) + 3 <= size:
+        top = len(deps) - 1
+        deps += [[top], [top], [top + 1, top + 2]]
+
+    while len(deps) < size:
+        deps.append([len(deps) - 1])
+
+    return _build(f"diamond_{size}", deps)
+
+
+def layered(size: int, width: int = 10, fan_in: int = 3, seed: int = 0) -> Shape:
+    """Random layered graph where each gear depends on the previous layer."""
+    rng = random.Random(seed)
+    deps: List[List[int]] = []
+    previous: List[int] = []
+
+    while len(deps) < size:
+        layer = []
+        for _ in range(min(width, size - len(deps))):
+            parents = sorted(rng.sample(previous, min(fan_in, len(previous))))
+            layer.append(len(deps))
+            deps.append(parents)
+        previous = layer
+
+    return _build(f"layered_{size}_{width}_{fan_in}_{seed}", deps)
+
+
+def generate(shape: str, size: int) -> Shape:
+    """Generate a network shape by name."""
+    if shape not in SHAPES:
+        raise ValueError(f"unknown shape `{shape}` - choose one of {SHAPES}")
+
+    return globals()[shape](size)
@@ -54,3 +54,7 @@ networks[0].run({"a": 1, "b:" 2, "c": 3, "d": 5}, blocking=True)
 5
 
 """
+
+from datagears.engine.registry import get_networks, init
+
+__all__ = ["get_networks", "init"]
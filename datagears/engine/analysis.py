@@ -1,29 +1,116 @@
 import inspect
-from typing import Callable, Dict, Type
+from types import MappingProxyType
+from typing import Any, Callable, Mapping, NamedTuple, Optional, Tuple, Type
+from weakref import WeakKeyDictionary
+
+HINTS = frozenset({"backend", "cache", "fuse", "vectorized"})
+
+
+def hints(**options: Any) -> Callable:
+    """Attach execution hints to a gear function."""
+    unknown = options.keys() - HINTS
+    if unknown:
+        raise ValueError(f"unknown gear hints: {sorted(unknown)}")
+
+    def decorator(func: Callable) -> Callable:
+        func.__gear_hints__ = {**getattr(func, "__gear_hints__", {}), **options}
+        _signatures.pop(func, None)
+        return func
+
+    return decorator
+
+
+class FunctionSignature(NamedTuple):
+    """Analyzed signature of a gear function."""
+
+    params: Mapping[str, inspect.Parameter]
+    return_type: Any
+    hints: Mapping[str, Any]
+    dependencies: Tuple[Tuple[str, Callable], ...]
+    inputs: Tuple[inspect.Parameter, ...]
+
+
+# NOTE: Analyzed signatures by function, entries go away with their function.
+_signatures: "WeakKeyDictionary[Callable, FunctionSignature]" = WeakKeyDictionary()
+
+
+def _analyze(func: Callable) -> FunctionSignature:
+    """Inspect a function and split its parameters into dependencies and inputs."""
+    from datagears.engine.network import Depends
+
+    signature = inspect.signature(func)
+    params = dict(signature.parameters)
+
+    dependencies = []
+    inputs = []
+    for name, param in params.items():
+        if param.default and isinstance(param.default, Depends):
+            dependencies.append((name, param.default._func))
+        else:
+            inputs.append(param)
+
+    # NOTE: Signatures are shared by every gear of the function, mappings are
+    # read-only so no caller can alter them for the others.
+    return FunctionSignature(
+        params=MappingProxyType(params),
+        return_type=signature.return_annotation,
+        hints=MappingProxyType(dict(getattr(func, "__gear_hints__", {}))),
+        dependencies=tuple(dependencies),
+        inputs=tuple(inputs),
+    )
+
+
+def analyze(func: Callable) -> FunctionSignature:
+    """Analyzed signature of a function, inspected once per function."""
+    try:
+        analyzed: Optional[FunctionSignature] = _signatures.get(func)
+    except TypeError:
+        # NOTE: Objects which can not be weakly referenced are never cached.
+        return _analyze(func)
+
+    if analyzed is None:
+        analyzed = _signatures[func] = _analyze(func)
+
+    return analyzed
 
 
 class Signature:
     """Analyze function signature."""
 
+    __slots__ = ("_func", "_name", "_analyzed")
+
     def __init__(self, func: Callable) -> None:
         """Signature constructor."""
         self._func = func
         self._name = func.__name__
-        self._signature = inspect.signature(func)
-        self._params = dict(self._signature.parameters)
-        self._return_type = self._signature.return_annotation
+        self._analyzed: FunctionSignature = analyze(func)
 
     @property
     def name(self) -> str:
         """Returns the name of the wrapped object."""
         return self._name
 
+    @property
+    def hints(self) -> Mapping[str, Any]:
+        """Get execution hints attached to the function."""
+        return self._analyzed.hints
+
     @property
     def output_type(self) -> Type:
         """Get output type."""
-        return self._return_type
+        return self._analyzed.return_type
 
     @property
-    def params(self) -> Dict:
+    def params(self) -> Mapping[str, inspect.Parameter]:
         """Get all function input parameters."""
-        return self._params
+        return self._analyzed.params
+
+    @property
+    def dependencies(self) -> Tuple[Tuple[str, Callable], ...]:
+        """Get parameters computed by other gears with their functions."""
+        return self._analyzed.dependencies
+
+    @property
+    def inputs(self) -> Tuple[inspect.Parameter, ...]:
+        """Get parameters which are inputs of the network."""
+        return self._analyzed.inputs
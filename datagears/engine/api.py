@@ -60,6 +60,6 @@ class EngineAPI(metaclass=abc.ABCMeta):
         """Runs the computational network and returns the result object."""
         raise NotImplementedError
 
-    def register():
+    def register(self) -> str:
         """Registers the computational network with RedisGears."""
         raise NotImplementedError
@@ -0,0 +1,382 @@
+import abc
+import asyncio
+import inspect
+import itertools
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Type, Union
+
+from datagears.engine.pool import WorkerPool
+from datagears.engine.worker import (ObjectRef, drop_objects, execute,
+                                     execute_async, execute_stored,
+                                     fetch_object, resolve)
+
+
+def then(future: Future, callback: Callable[[Any], Future]) -> Future:
+    """Chain a call returning a future onto the result of another future."""
+    chained: Future = Future()
+
+    def forward(future: Future) -> None:
+        try:
+            result = future.result()
+        except BaseException as e:
+            return chained.set_exception(e)
+
+        chained.set_result(result)
+
+    def start(future: Future) -> None:
+        try:
+            callback(future.result()).add_done_callback(forward)
+        except BaseException as e:
+            chained.set_exception(e)
+
+    future.add_done_callback(start)
+    return chained
+
+
+class Backend(metaclass=abc.ABCMeta):
+    """Executes gear functions and hands back futures of their results."""
+
+    name: str = ""
+    remote: bool = False
+
+    def __enter__(self) -> "Backend":
+        """Enter backend context."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Exit backend context and release its resources."""
+        self.shutdown(wait=True)
+
+    def __repr__(self) -> str:
+        """String representation of a backend."""
+        return f"{type(self).__name__}()"
+
+    @abc.abstractmethod
+    def submit(self, target, kwargs: dict) -> Future:
+        """Schedule a gear function call."""
+        raise NotImplementedError
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Release resources held by the backend."""
+        pass
+
+
+class InlineBackend(Backend):
+    """Serial backend which runs gears in the calling thread."""
+
+    name = "inline"
+
+    def submit(self, target, kwargs: dict) -> Future:
+        """Run a gear function immediately."""
+        future: Future = Future()
+
+        try:
+            future.set_result(execute(target, kwargs))
+        except Exception as e:
+            future.set_exception(e)
+
+        return future
+
+
+class ThreadBackend(Backend):
+    """Thread pool backend for I/O bound gears and gears releasing the GIL."""
+
+    name = "thread"
+
+    def __init__(self, max_workers: Optional[int] = None) -> None:
+        """Thread backend constructor."""
+        self._max_workers: Optional[int] = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Returns the underlying executor, starting it on first use."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers, thread_name_prefix="datagears"
+                )
+
+            return self._executor
+
+    def submit(self, target, kwargs: dict) -> Future:
+        """Run a gear function on a pool thread."""
+        return self.executor.submit(execute, target, kwargs)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop pool threads."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+class ProcessBackend(Backend):
+    """Process pool backend for CPU bound gears."""
+
+    name = "process"
+    remote = True
+
+    def __init__(self, pool: Optional[WorkerPool] = None) -> None:
+        """Process backend constructor."""
+        self._pool: WorkerPool = pool or WorkerPool.default()
+
+    def __repr__(self) -> str:
+        """String representation of a backend."""
+        return f"ProcessBackend({self._pool!r})"
+
+    @property
+    def pool(self) -> WorkerPool:
+        """Worker pool of the backend."""
+        return self._pool
+
+    def submit(self, target, kwargs: dict) -> Future:
+        """Run a gear function in a worker process."""
+        return self._pool.executor.submit(execute, target, kwargs)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop worker processes."""
+        self._pool.shutdown(wait=wait)
+
+
+class AsyncioBackend(Backend):
+    """Event loop backend which awaits `async def` gears natively."""
+
+    name = "asyncio"
+
+    def __init__(self) -> None:
+        """Asyncio backend constructor."""
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """Returns the backend event loop, starting it on first use."""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._serve,
+                    args=(self._loop,),
+                    name="datagears-asyncio",
+                    daemon=True,
+                )
+                self._thread.start()
+
+            return self._loop
+
+    @staticmethod
+    def _serve(loop: asyncio.AbstractEventLoop) -> None:
+        """Run the loop until stopped, then close it from its own thread."""
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    def submit(self, target, kwargs: dict) -> Future:
+        """Await coroutine gears on the loop, run other gears off the loop."""
+        loop = self.loop
+        if inspect.iscoroutinefunction(resolve(target)):
+            coroutine = execute_async(target, kwargs)
+        else:
+            coroutine = asyncio.to_thread(execute, target, kwargs)
+
+        return asyncio.run_coroutine_threadsafe(coroutine, loop)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the backend event loop."""
+        with self._lock:
+            loop, self._loop = self._loop, None
+            thread, self._thread = self._thread, None
+
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            if wait:
+                thread.join()
+
+
+class LocalityBackend(Backend):
+    """Process backend keeping results in the worker which produced them."""
+
+    name = "locality"
+    remote = True
+
+    def __init__(self, max_workers: int = 4) -> None:
+        """Locality backend constructor."""
+        if max_workers < 1:
+            raise ValueError("locality backend needs at least one worker")
+
+        # NOTE: Every worker is a separate single process executor so gears can be
+        # placed on the worker holding their inputs.
+        self._workers: List[Optional[ProcessPoolExecutor]] = [None] * max_workers
+        self._load: List[int] = [0] * max_workers
+        self._keys = itertools.count()
+        self._lock = threading.Lock()
+        self.transferred: int = 0
+
+    def __repr__(self) -> str:
+        """String representation of a backend."""
+        return f"LocalityBackend(max_workers={len(self._workers)})"
+
+    def _worker(self, worker: int) -> ProcessPoolExecutor:
+        """Returns executor of a worker, starting it on first use."""
+        with self._lock:
+            if self._workers[worker] is None:
+                self._workers[worker] = ProcessPoolExecutor(max_workers=1)
+
+            return self._workers[worker]
+
+    def _place(self, kwargs: dict) -> int:
+        """Pick the worker holding most input bytes, then the least loaded one."""
+        held = [0] * len(self._workers)
+        for value in kwargs.values():
+            if isinstance(value, ObjectRef):
+                held[value.worker] += value.nbytes + 1
+
+        with self._lock:
+            return max(
+                range(len(self._workers)), key=lambda w: (held[w], -self._load[w])
+            )
+
+    def _run(self, worker: int, func: Callable, *args) -> Future:
+        """Run a call on the given worker, tracking its load."""
+        with self._lock:
+            self._load[worker] += 1
+
+        future = self._worker(worker).submit(func, *args)
+
+        def done(_: Future) -> None:
+            with self._lock:
+                self._load[worker] -= 1
+
+        future.add_done_callback(done)
+        return future
+
+    def submit(self, target, kwargs: dict) -> Future:
+        """Run a gear function in the least loaded worker."""
+        return self._run(self._place(kwargs), execute, target, kwargs)
+
+    def submit_stored(self, target, kwargs: dict) -> Future:
+        """Run a gear function next to its inputs and keep its result there."""
+        worker = self._place(kwargs)
+        moved = {
+            name: value
+            for name, value in kwargs.items()
+            if isinstance(value, ObjectRef) and value.worker != worker
+        }
+
+        def store(kwargs: dict) -> Future:
+            key = next(self._keys)
+            stored = self._run(worker, execute_stored, target, kwargs, key)
+            return then(
+                stored, lambda nbytes: _resolved(ObjectRef(worker, key, nbytes))
+            )
+
+        if not moved:
+            return store(kwargs)
+
+        # NOTE: Inputs held by other workers are transferred through this process.
+        with self._lock:
+            self.transferred += len(moved)
+
+        return then(self.gather(moved), lambda values: store({**kwargs, **values}))
+
+    def fetch(self, ref: ObjectRef) -> Future:
+        """Fetch a value from the object store of its worker."""
+        return self._worker(ref.worker).submit(fetch_object, ref.key)
+
+    def gather(self, values: dict) -> Future:
+        """Replace object references of a dict by their values."""
+        refs = {
+            name: self.fetch(value)
+            for name, value in values.items()
+            if isinstance(value, ObjectRef)
+        }
+        gathered: Future = Future()
+        remaining = [len(refs)]
+
+        def fetched(_: Future) -> None:
+            with self._lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+
+            try:
+                gathered.set_result(
+                    {
+                        name: refs[name].result() if name in refs else value
+                        for name, value in values.items()
+                    }
+                )
+            except BaseException as e:
+                gathered.set_exception(e)
+
+        if not refs:
+            gathered.set_result(dict(values))
+
+        for future in refs.values():
+            future.add_done_callback(fetched)
+
+        return gathered
+
+    def release(self, refs: Iterable[ObjectRef]) -> None:
+        """Drop values from the object stores of running workers."""
+        keys: Dict[int, List[int]] = {}
+        for ref in refs:
+            keys.setdefault(ref.worker, []).append(ref.key)
+
+        for worker, worker_keys in keys.items():
+            executor = self._workers[worker]
+            if executor is not None:
+                executor.submit(drop_objects, worker_keys)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop worker processes, dropping their object stores."""
+        with self._lock:
+            workers, self._workers = self._workers, [None] * len(self._workers)
+
+        for executor in workers:
+            if executor is not None:
+                executor.shutdown(wait=wait)
+
+
+def _resolved(value: Any) -> Future:
+    """Returns a future already holding a value."""
+    future: Future = Future()
+    future.set_result(value)
+    return future
+
+
+BACKENDS: Dict[str, Type[Backend]] = {
+    backend.name: backend
+    for backend in (
+        InlineBackend,
+        ThreadBackend,
+        ProcessBackend,
+        AsyncioBackend,
+        LocalityBackend,
+    )
+}
+
+_defaults: Dict[str, Backend] = {}
+_defaults_lock = threading.Lock()
+
+
+def get_backend(backend: Union[str, Backend, None] = None) -> Backend:
+    """Returns a backend instance, named backends are shared process-wide."""
+    if isinstance(backend, Backend):
+        return backend
+
+    name = backend or ProcessBackend.name
+    if name not in BACKENDS:
+        raise ValueError(f"unknown backend `{name}` - choose one of {sorted(BACKENDS)}")
+
+    with _defaults_lock:
+        if name not in _defaults:
+            _defaults[name] = BACKENDS[name]()
+
+        return _defaults[name]
@@ -0,0 +1,185 @@
+import hashlib
+import marshal
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Optional, Tuple, Union
+
+from datagears.engine.worker import FunctionRef, function_ref
+
+_MISSING = object()
+
+
+def _identity(target: Union[FunctionRef, Callable]) -> Optional[str]:
+    """Name and code digest of an importable function, `None` for others."""
+    ref = target if isinstance(target, FunctionRef) else function_ref(target)
+    if not isinstance(ref, FunctionRef):
+        return None
+
+    try:
+        func = ref.resolve()
+    except (ImportError, AttributeError):
+        return None
+
+    # NOTE: Entries of a function go stale once its code changes, the digest
+    # keeps them from being served from the disk tier.
+    code = getattr(func, "__code__", None)
+    digest = hashlib.sha256(marshal.dumps(code)).hexdigest() if code else ""
+
+    return f"{ref.module}:{ref.qualname}:{digest}"
+
+
+class GearCache:
+    """Bounded LRU cache of gear results with an optional on-disk tier."""
+
+    def __init__(self, maxsize: int = 128, directory: Optional[str] = None) -> None:
+        """Gear cache constructor."""
+        if maxsize < 1:
+            raise ValueError("cache needs room for at least one entry")
+
+        self._maxsize: int = maxsize
+        self._directory: Optional[str] = directory
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits: int = 0
+        self.misses: int = 0
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self) -> int:
+        """Number of entries held in memory."""
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        """Check if key is cached in memory or on disk."""
+        return key in self._entries or (
+            self._directory is not None and os.path.exists(self._path(key))
+        )
+
+    def __repr__(self) -> str:
+        """String representation of a cache."""
+        return f"GearCache(maxsize={self._maxsize}, directory={self._directory!r})"
+
+    @staticmethod
+    def key(target: Union[FunctionRef, Callable], kwargs: dict) -> Optional[str]:
+        """Fingerprint of a gear call, `None` when it can not be identified."""
+        # NOTE: Functions which can not be imported by name, e.g. closures, share
+        # their qualified name with other functions and are never cached.
+        identity = [_identity(target)] + [
+            _identity(value)
+            for value in kwargs.values()
+            if isinstance(value, FunctionRef)
+        ]
+        if None in identity:
+            return None
+
+        try:
+            payload = pickle.dumps(
+                (identity, sorted(kwargs.items())), protocol=pickle.HIGHEST_PROTOCOL
+            )
+        except Exception:
+            return None
+
+        return hashlib.sha256(payload).hexdigest()
+
+    def _path(self, key: str) -> str:
+        """Disk location of a cache entry."""
+        return os.path.join(self._directory, f"{key}.pkl")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Returns cached value, promoting disk entries into memory."""
+        value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def _lookup(self, key: str) -> Any:
+        """Find a cached value and update hit statistics."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        value = _MISSING
+        if self._directory is not None:
+            try:
+                with open(self._path(key), "rb") as f:
+                    value = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                value = _MISSING
+
+        with self._lock:
+            if value is _MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._remember(key, value)
+
+        return value
+
+    def _remember(self, key: str, value: Any) -> None:
+        """Store value in memory, evicting least recently used entries."""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a gear result."""
+        with self._lock:
+            self._remember(key, value)
+
+        if self._directory is None:
+            return
+
+        # NOTE: Write to a temporary file first so readers never see partial entries.
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self._directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except (OSError, pickle.PicklingError, TypeError, AttributeError):
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def clear(self) -> None:
+        """Drop all entries from memory and disk."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+        if self._directory is not None:
+            for name in os.listdir(self._directory):
+                if name.endswith(".pkl"):
+                    os.remove(os.path.join(self._directory, name))
+
+    def submit(self, backend, target, kwargs: dict) -> Future:
+        """Serve a gear call from cache or submit it to the backend."""
+        key = self.key(target, kwargs)
+        if key is None:
+            return backend.submit(target, kwargs)
+
+        value = self._lookup(key)
+        if value is not _MISSING:
+            future: Future = Future()
+            future.set_result(value)
+            return future
+
+        future = backend.submit(target, kwargs)
+        future.add_done_callback(lambda f: self._store(key, f))
+        return future
+
+    def _store(self, key: str, future: Future) -> None:
+        """Cache the result of a successful gear call."""
+        if not future.cancelled() and future.exception() is None:
+            self.put(key, future.result())
+
+    @property
+    def info(self) -> Tuple[int, int, int]:
+        """Returns hits, misses and current in-memory size."""
+        return self.hits, self.misses, len(self._entries)
@@ -0,0 +1,213 @@
+from array import array
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from networkx import MultiDiGraph
+
+
+class GraphCore:
+    """Compact directed multigraph of integer node ids with CSR adjacency."""
+
+    __slots__ = (
+        "name",
+        "_nodes",
+        "_index",
+        "_src",
+        "_dst",
+        "_params",
+        "_version",
+        "_adjacency",
+        "_views",
+    )
+
+    def __init__(self, name: str = "") -> None:
+        """Graph core constructor."""
+        self.name: str = name
+        self._nodes: List[Any] = []
+        self._index: Dict[Any, int] = {}
+        self._src = array("q")
+        self._dst = array("q")
+        self._params: List[Optional[str]] = []
+        self._version: int = 0
+        self._adjacency: Optional[Tuple[array, array, array, array]] = None
+        self._views: Dict[str, Any] = {}
+
+    def __repr__(self) -> str:
+        """String representation of a graph core."""
+        return (
+            f"GraphCore({self.name}, nodes={len(self._nodes)}, edges={len(self._src)})"
+        )
+
+    def __len__(self) -> int:
+        """Number of nodes."""
+        return len(self._nodes)
+
+    def __contains__(self, node: Any) -> bool:
+        """Check if a node belongs to the graph."""
+        return node in self._index
+
+    def __iter__(self) -> Iterator[Any]:
+        """Iterate over nodes in insertion order."""
+        return iter(self._nodes)
+
+    @property
+    def version(self) -> int:
+        """Counter bumped by every mutation of the graph."""
+        return self._version
+
+    @property
+    def nodes(self) -> List[Any]:
+        """Nodes in insertion order, must not be modified."""
+        return self._nodes
+
+    def id(self, node: Any) -> int:
+        """Integer id of a node."""
+        return self._index[node]
+
+    def node(self, node_id: int) -> Any:
+        """Node of an integer id."""
+        return self._nodes[node_id]
+
+    def add_node(self, node: Any) -> int:
+        """Add a node unless present, returns its id."""
+        node_id = self._index.get(node)
+        if node_id is None:
+            node_id = self._index[node] = len(self._nodes)
+            self._nodes.append(node)
+            self._touch()
+
+        return node_id
+
+    def add_edge(self, src: Any, dst: Any, param: Optional[str] = None) -> None:
+        """Add an edge, adding its nodes when missing."""
+        self._src.append(self.add_node(src))
+        self._dst.append(self.add_node(dst))
+        self._params.append(param)
+        self._touch()
+
+    def _touch(self) -> None:
+        """Drop adjacency and views derived from the previous graph version."""
+        self._version += 1
+        self._adjacency = None
+        if self._views:
+            self._views = {}
+
+    def cached(self, key: str, compute: Callable[[], Any]) -> Any:
+        """View derived from the graph, recomputed only after a mutation."""
+        try:
+            return self._views[key]
+        except KeyError:
+            value = self._views[key] = compute()
+            return value
+
+    def _csr(self, keys: array) -> Tuple[array, array]:
+        """Offsets and edge ids of edges grouped by the given endpoint."""
+        offsets = array("q", bytes(8 * (len(self._nodes) + 1)))
+        for node_id in keys:
+            offsets[node_id + 1] += 1
+        for node_id in range(len(self._nodes)):
+            offsets[node_id + 1] += offsets[node_id]
+
+        # NOTE: Counting sort keeps edges of a node in insertion order.
+        edges = array("q", bytes(8 * len(keys)))
+        fill = array("q", offsets[:-1])
+        for edge_id, node_id in enumerate(keys):
+            edges[fill[node_id]] = edge_id
+            fill[node_id] += 1
+
+        return offsets, edges
+
+    @property
+    def adjacency(self) -> Tuple[array, array, array, array]:
+        """Incoming and outgoing edges of every node as CSR arrays."""
+        if self._adjacency is None:
+            self._adjacency = self._csr(self._dst) + self._csr(self._src)
+
+        return self._adjacency
+
+    def in_edge_ids(self, node_id: int) -> array:
+        """Ids of edges ending in a node."""
+        offsets, edges, _, _ = self.adjacency
+        return edges[offsets[node_id] : offsets[node_id + 1]]
+
+    def out_edge_ids(self, node_id: int) -> array:
+        """Ids of edges starting in a node."""
+        _, _, offsets, edges = self.adjacency
+        return edges[offsets[node_id] : offsets[node_id + 1]]
+
+    def in_edges(self, node: Any, data: Optional[str] = None) -> List[tuple]:
+        """Edges ending in a node, with their `param` when `data="param"`."""
+        edge_ids = self.in_edge_ids(self._index[node])
+        return self._edges(edge_ids, data)
+
+    def out_edges(self, node: Any, data: Optional[str] = None) -> List[tuple]:
+        """Edges starting in a node, with their `param` when `data="param"`."""
+        edge_ids = self.out_edge_ids(self._index[node])
+        return self._edges(edge_ids, data)
+
+    def _edges(self, edge_ids, data: Optional[str]) -> List[tuple]:
+        """Edge tuples in the format of networkx edge views."""
+        nodes, src, dst = self._nodes, self._src, self._dst
+        if data is None:
+            return [(nodes[src[e]], nodes[dst[e]]) for e in edge_ids]
+
+        if data != "param":
+            raise KeyError(f"edges only carry `param` data, not `{data}`")
+
+        params = self._params
+        return [(nodes[src[e]], nodes[dst[e]], params[e]) for e in edge_ids]
+
+    def predecessors(self, node: Any) -> Iterator[Any]:
+        """Distinct nodes with an edge into a node."""
+        src = self._src
+        ids = dict.fromkeys(src[e] for e in self.in_edge_ids(self._index[node]))
+        return (self._nodes[node_id] for node_id in ids)
+
+    def successors(self, node: Any) -> Iterator[Any]:
+        """Distinct nodes with an edge from a node."""
+        dst = self._dst
+        ids = dict.fromkeys(dst[e] for e in self.out_edge_ids(self._index[node]))
+        return (self._nodes[node_id] for node_id in ids)
+
+    def in_degree(self, node: Any) -> int:
+        """Number of edges ending in a node."""
+        offsets, _, _, _ = self.adjacency
+        node_id = self._index[node]
+        return offsets[node_id + 1] - offsets[node_id]
+
+    def topological_order(self) -> List[int]:
+        """Node ids ordered so that every edge points forward."""
+        in_offsets, _, out_offsets, out_edges = self.adjacency
+        dst = self._dst
+        pending = array(
+            "q", (in_offsets[n + 1] - in_offsets[n] for n in range(len(self._nodes)))
+        )
+        order = [node_id for node_id in range(len(self._nodes)) if not pending[node_id]]
+
+        for node_id in order:
+            for edge_id in out_edges[out_offsets[node_id] : out_offsets[node_id + 1]]:
+                consumer = dst[edge_id]
+                pending[consumer] -= 1
+                if not pending[consumer]:
+                    order.append(consumer)
+
+        if len(order) != len(self._nodes):
+            raise ValueError(f"graph `{self.name}` contains a cycle")
+
+        return order
+
+    def to_networkx(self) -> MultiDiGraph:
+        """Materialize the graph as a networkx multigraph, cached per version."""
+        return self.cached("networkx", self._materialize)
+
+    def _materialize(self) -> MultiDiGraph:
+        """Build a networkx multigraph of the graph."""
+        graph = MultiDiGraph(name=self.name)
+        graph.add_nodes_from(self._nodes)
+        nodes = self._nodes
+        for src, dst, param in zip(self._src, self._dst, self._params):
+            if param is None:
+                graph.add_edge(nodes[src], nodes[dst])
+            else:
+                graph.add_edge(nodes[src], nodes[dst], param=param)
+
+        return graph
@@ -0,0 +1,562 @@
+import abc
+import argparse
+import math
+import pickle
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing.managers import BaseManager
+from typing import Any, Dict, List, Optional, Tuple
+
+from datagears.engine.backends import Backend
+from datagears.engine.nodes import GearException
+from datagears.engine.worker import execute
+
+# NOTE: Leased task as handed to workers, task id, payload and lease duration.
+Task = Tuple[str, bytes, float]
+
+
+class WorkerLostError(Exception):
+    """Raised when a task was not completed within its retries."""
+
+
+def _encode(value: Any) -> bytes:
+    """Encode a task or a result."""
+    return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _encode_error(error: Exception) -> bytes:
+    """Encode a failed result, replacing errors which can not be pickled."""
+    try:
+        return _encode((False, error))
+    except Exception:
+        cause = getattr(error, "raised_exception", error)
+        replacement = GearException(
+            gear=getattr(error, "gear", None),
+            params={},
+            raised_exception=RuntimeError(repr(cause)),
+        )
+        return _encode((False, replacement))
+
+
+class TaskQueue(metaclass=abc.ABCMeta):
+    """Queue of gear calls which workers lease, execute and complete."""
+
+    def __init__(self, lease: float = 30.0, max_retries: int = 2) -> None:
+        """Task queue constructor."""
+        self.lease: float = lease
+        self.max_retries: int = max_retries
+
+    @abc.abstractmethod
+    def put(self, task_id: str, payload: bytes) -> None:
+        """Add a task to the queue."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def take(self, timeout: float = 1.0) -> Optional[Task]:
+        """Lease the next task, waiting up to `timeout` seconds for one."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def touch(self, task_id: str) -> None:
+        """Extend the lease of a running task."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def complete(self, task_id: str, payload: bytes) -> None:
+        """Post the result of a task, later results of the same task are ignored."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def results(self) -> List[Tuple[str, bytes]]:
+        """Pop results of completed tasks, retrying tasks of lost workers."""
+        raise NotImplementedError
+
+    def _lost(self, task_id: str, attempts: int) -> bytes:
+        """Failure result of a task which ran out of retries."""
+        return _encode(
+            (
+                False,
+                WorkerLostError(
+                    f"task `{task_id}` was lost by {attempts} workers, giving up"
+                ),
+            )
+        )
+
+
+class InMemoryTaskQueue(TaskQueue):
+    """Task queue shared by threads of a process or served over a socket."""
+
+    def __init__(self, lease: float = 30.0, max_retries: int = 2) -> None:
+        """In-memory task queue constructor."""
+        super().__init__(lease, max_retries)
+        self._pending: deque = deque()
+        self._tasks: Dict[str, bytes] = {}
+        self._attempts: Dict[str, int] = {}
+        self._leases: Dict[str, float] = {}
+        self._results: Dict[str, bytes] = {}
+        self._cond = threading.Condition()
+
+    def __repr__(self) -> str:
+        """String representation of a queue."""
+        return f"InMemoryTaskQueue(pending={len(self._pending)})"
+
+    def _expire(self) -> None:
+        """Requeue tasks whose lease ran out."""
+        now = time.time()
+        for task_id, deadline in list(self._leases.items()):
+            if deadline > now:
+                continue
+
+            del self._leases[task_id]
+            if self._attempts[task_id] > self.max_retries:
+                self._tasks.pop(task_id)
+                self._results[task_id] = self._lost(
+                    task_id, self._attempts.pop(task_id)
+                )
+            else:
+                self._pending.append(task_id)
+                self._cond.notify()
+
+    def put(self, task_id: str, payload: bytes) -> None:
+        """Add a task to the queue."""
+        with self._cond:
+            self._tasks[task_id] = payload
+            self._attempts[task_id] = 0
+            self._pending.append(task_id)
+            self._cond.notify()
+
+    def take(self, timeout: float = 1.0) -> Optional[Task]:
+        """Lease the next task, waiting up to `timeout` seconds for one."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                self._expire()
+
+                # NOTE: Requeued tasks may have been completed by a slow worker.
+                while self._pending and self._pending[0] not in self._tasks:
+                    self._pending.popleft()
+                if self._pending:
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(min(remaining, self.lease))
+
+            task_id = self._pending.popleft()
+            self._attempts[task_id] += 1
+            self._leases[task_id] = time.time() + self.lease
+
+            return task_id, self._tasks[task_id], self.lease
+
+    def touch(self, task_id: str) -> None:
+        """Extend the lease of a running task."""
+        with self._cond:
+            if task_id in self._leases:
+                self._leases[task_id] = time.time() + self.lease
+
+    def complete(self, task_id: str, payload: bytes) -> None:
+        """Post the result of a task, later results of the same task are ignored."""
+        with self._cond:
+            if self._tasks.pop(task_id, None) is None:
+                return
+
+            self._leases.pop(task_id, None)
+            self._attempts.pop(task_id, None)
+            self._results[task_id] = payload
+
+    def results(self) -> List[Tuple[str, bytes]]:
+        """Pop results of completed tasks, retrying tasks of lost workers."""
+        with self._cond:
+            self._expire()
+            results, self._results = list(self._results.items()), {}
+
+        return results
+
+
+class RedisTaskQueue(TaskQueue):
+    """Task queue kept in Redis, shared by workers on any host."""
+
+    def __init__(
+        self,
+        client: Any,
+        name: str = "datagears:tasks",
+        lease: float = 30.0,
+        max_retries: int = 2,
+    ) -> None:
+        """Redis task queue constructor."""
+        super().__init__(lease, max_retries)
+        self._client = client
+        self._name: str = name
+
+    def __repr__(self) -> str:
+        """String representation of a queue."""
+        return f"RedisTaskQueue({self._name})"
+
+    def _key(self, kind: str) -> str:
+        """Redis key of a part of the queue."""
+        return f"{self._name}:{kind}"
+
+    def _expire(self) -> None:
+        """Requeue tasks whose lease ran out or which were never leased."""
+        now = time.time()
+        leases = self._client.hgetall(self._key("leases"))
+        for task_id, deadline in leases.items():
+            # NOTE: Only the client which removes the lease requeues the task.
+            if float(deadline) > now or not self._client.hdel(
+                self._key("leases"), task_id
+            ):
+                continue
+
+            attempts = int(self._client.hget(self._key("attempts"), task_id) or 0)
+            if attempts > self.max_retries:
+                self.complete(task_id.decode(), self._lost(task_id.decode(), attempts))
+            else:
+                self._requeue(task_id)
+
+        # NOTE: A worker lost between claiming a task and leasing it leaves the
+        # task in the processing list without a lease, it is requeued once it
+        # stayed unleased for a whole lease period.
+        orphans = self._client.hgetall(self._key("orphans"))
+        processing = set(self._client.lrange(self._key("processing"), 0, -1))
+        for task_id in processing - leases.keys():
+            seen = orphans.get(task_id)
+            if seen is None:
+                self._client.hsetnx(self._key("orphans"), task_id, now)
+            elif float(seen) + self.lease <= now and not self._client.hexists(
+                self._key("leases"), task_id
+            ):
+                self._requeue(task_id)
+
+        stale = orphans.keys() - (processing - leases.keys())
+        if stale:
+            self._client.hdel(self._key("orphans"), *stale)
+
+    def _requeue(self, task_id: bytes) -> None:
+        """Move a claimed task back to the pending tasks."""
+        self._client.hdel(self._key("orphans"), task_id)
+        if self._client.lrem(self._key("processing"), 1, task_id):
+            self._client.rpush(self._key("pending"), task_id)
+
+    def put(self, task_id: str, payload: bytes) -> None:
+        """Add a task to the queue."""
+        self._client.hset(self._key("tasks"), task_id, payload)
+        self._client.rpush(self._key("pending"), task_id)
+
+    def take(self, timeout: float = 1.0) -> Optional[Task]:
+        """Lease the next task, waiting up to `timeout` seconds for one."""
+        # NOTE: The task is moved to the processing list by the pop itself, so a
+        # worker lost before writing the lease never loses the task.
+        task_id = self._client.blmove(
+            self._key("pending"),
+            self._key("processing"),
+            max(1, math.ceil(timeout)),
+            "LEFT",
+            "RIGHT",
+        )
+        if task_id is None:
+            return None
+
+        pipeline = self._client.pipeline()
+        pipeline.hget(self._key("tasks"), task_id)
+        pipeline.hincrby(self._key("attempts"), task_id, 1)
+        pipeline.hset(self._key("leases"), task_id, time.time() + self.lease)
+        payload, _, _ = pipeline.execute()
+
+        if payload is None:
+            # NOTE: Stale entry of a task which was completed meanwhile.
+            self._client.hdel(self._key("leases"), task_id)
+            self._client.hdel(self._key("attempts"), task_id)
+            self._client.lrem(self._key("processing"), 1, task_id)
+            return None
+
+        return task_id.decode(), payload, self.lease
+
+    def touch(self, task_id: str) -> None:
+        """Extend the lease of a running task."""
+        if self._client.hexists(self._key("leases"), task_id):
+            self._client.hset(self._key("leases"), task_id, time.time() + self.lease)
+
+    def complete(self, task_id: str, payload: bytes) -> None:
+        """Post the result of a task, later results of the same task are ignored."""
+        if not self._client.hdel(self._key("tasks"), task_id):
+            return
+
+        self._client.hdel(self._key("leases"), task_id)
+        self._client.hdel(self._key("attempts"), task_id)
+        self._client.lrem(self._key("processing"), 1, task_id)
+        self._client.hset(self._key("results"), task_id, payload)
+
+    def results(self) -> List[Tuple[str, bytes]]:
+        """Pop results of completed tasks, retrying tasks of lost workers."""
+        self._expire()
+
+        results = self._client.hgetall(self._key("results"))
+        if results:
+            self._client.hdel(self._key("results"), *results)
+
+        return [(task_id.decode(), payload) for task_id, payload in results.items()]
+
+
+class _QueueManager(BaseManager):
+    """Manager serving a task queue over a socket."""
+
+
+# NOTE: Queue owned by the server process of a `TaskQueueServer`.
+_served: Optional[InMemoryTaskQueue] = None
+
+
+def _serve(lease: float, max_retries: int) -> None:
+    """Create the queue of the server process."""
+    global _served
+    _served = InMemoryTaskQueue(lease, max_retries)
+
+
+def _served_queue() -> InMemoryTaskQueue:
+    """Returns the queue of the server process."""
+    return _served
+
+
+_QueueManager.register("queue", callable=_served_queue)
+
+
+class TaskQueueServer:
+    """In-memory task queue served to workers over a socket."""
+
+    def __init__(
+        self,
+        address: Tuple[str, int] = ("127.0.0.1", 0),
+        authkey: bytes = b"datagears",
+        lease: float = 30.0,
+        max_retries: int = 2,
+    ) -> None:
+        """Task queue server constructor."""
+        self._authkey: bytes = authkey
+        self._options: Tuple[float, int] = (lease, max_retries)
+        self._manager = _QueueManager(address, authkey)
+
+    def __enter__(self) -> "TaskQueueServer":
+        """Start the server."""
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Stop the server."""
+        self.shutdown()
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """Address workers connect to."""
+        return self._manager.address
+
+    def start(self) -> None:
+        """Start the server process."""
+        self._manager.start(_serve, self._options)
+
+    def shutdown(self) -> None:
+        """Stop the server process, dropping all queued tasks."""
+        self._manager.shutdown()
+
+    def queue(self) -> TaskQueue:
+        """Returns a proxy to the served queue."""
+        return connect(self.address, self._authkey)
+
+
+def connect(address: Tuple[str, int], authkey: bytes = b"datagears") -> TaskQueue:
+    """Connect to the queue of a `TaskQueueServer`."""
+    manager = _QueueManager(tuple(address), authkey)
+    manager.connect()
+
+    return manager.queue()
+
+
+def work(
+    queue: TaskQueue,
+    max_tasks: Optional[int] = None,
+    idle_timeout: Optional[float] = None,
+    stop: Optional[threading.Event] = None,
+) -> int:
+    """Execute tasks of a queue until stopped, returns the number of tasks done."""
+    done = 0
+    idle_since = time.monotonic()
+
+    while max_tasks is None or done < max_tasks:
+        if stop is not None and stop.is_set():
+            break
+
+        task = queue.take(
+            timeout=1.0 if idle_timeout is None else min(idle_timeout, 1.0)
+        )
+        if task is None:
+            if (
+                idle_timeout is not None
+                and time.monotonic() - idle_since > idle_timeout
+            ):
+                break
+            continue
+
+        task_id, payload, lease = task
+        running = threading.Event()
+        heartbeat = threading.Thread(
+            target=_heartbeat, args=(queue, task_id, lease, running), daemon=True
+        )
+        heartbeat.start()
+
+        try:
+            target, kwargs = pickle.loads(payload)
+            result = _encode((True, execute(target, kwargs)))
+        except Exception as e:
+            result = _encode_error(e)
+        finally:
+            running.set()
+            heartbeat.join()
+
+        queue.complete(task_id, result)
+        done += 1
+        idle_since = time.monotonic()
+
+    return done
+
+
+def _heartbeat(
+    queue: TaskQueue, task_id: str, lease: float, finished: threading.Event
+) -> None:
+    """Keep extending the lease of a task while it runs."""
+    while not finished.wait(lease / 3):
+        queue.touch(task_id)
+
+
+class DistributedBackend(Backend):
+    """Backend submitting gear calls to workers pulling from a task queue."""
+
+    name = "distributed"
+    remote = True
+
+    def __init__(self, queue: TaskQueue, poll_interval: float = 0.01) -> None:
+        """Distributed backend constructor."""
+        self._queue = queue
+        self._poll_interval: float = poll_interval
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._collector: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._error: Optional[Exception] = None
+
+    def __repr__(self) -> str:
+        """String representation of a backend."""
+        return f"DistributedBackend({self._queue!r})"
+
+    @property
+    def queue(self) -> TaskQueue:
+        """Task queue of the backend."""
+        return self._queue
+
+    def submit(self, target, kwargs: dict) -> Future:
+        """Queue a gear function call for any worker."""
+        task_id = uuid.uuid4().hex
+        future: Future = Future()
+
+        with self._lock:
+            if self._error is not None:
+                raise RuntimeError(
+                    "distributed backend lost its task queue"
+                ) from self._error
+
+            self._futures[task_id] = future
+            if self._collector is None:
+                self._stop.clear()
+                self._collector = threading.Thread(
+                    target=self._collect, name="datagears-collector", daemon=True
+                )
+                self._collector.start()
+
+        self._queue.put(task_id, _encode((target, kwargs)))
+        return future
+
+    def _collect(self) -> None:
+        """Resolve futures as workers post results."""
+        try:
+            self._poll()
+        except Exception as e:
+            # NOTE: A lost queue (e.g. a Redis disconnect) fails every waiting run
+            # and every later submission instead of leaving them hanging.
+            with self._lock:
+                self._error = e
+            self._fail_pending(e)
+
+    def _poll(self) -> None:
+        """Poll the queue for results until stopped."""
+        while not self._stop.is_set():
+            results = self._queue.results()
+            if not results:
+                self._stop.wait(self._poll_interval)
+
+            for task_id, payload in results:
+                with self._lock:
+                    future = self._futures.pop(task_id, None)
+                # NOTE: Futures cancelled by a failed run are skipped, the
+                # collector keeps serving later runs.
+                if future is None or not future.set_running_or_notify_cancel():
+                    continue
+
+                try:
+                    ok, value = pickle.loads(payload)
+                except Exception as e:
+                    future.set_exception(e)
+                    continue
+
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+
+    def _fail_pending(self, error: Exception) -> None:
+        """Fail all futures still waiting for a result."""
+        with self._lock:
+            futures, self._futures = list(self._futures.values()), {}
+
+        for future in futures:
+            if future.set_running_or_notify_cancel():
+                future.set_exception(error)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop collecting results, failing calls which did not finish."""
+        with self._lock:
+            collector, self._collector = self._collector, None
+
+        self._stop.set()
+        if collector is not None and wait:
+            collector.join()
+
+        self._fail_pending(RuntimeError("distributed backend was shut down"))
+
+
+def main(argv: List[str] = None) -> int:
+    """Run a worker pulling gear calls from a task queue."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--address", help="task queue server as host:port")
+    parser.add_argument("--authkey", default="datagears")
+    parser.add_argument("--redis-uri", help="Redis holding the task queue")
+    parser.add_argument("--queue", default="datagears:tasks")
+    parser.add_argument("--max-tasks", type=int)
+    args = parser.parse_args(argv)
+
+    if args.redis_uri:
+        import redis
+
+        queue = RedisTaskQueue(redis.Redis.from_url(args.redis_uri), args.queue)
+    elif args.address:
+        host, port = args.address.rsplit(":", 1)
+        queue = connect((host, int(port)), args.authkey.encode())
+    else:
+        parser.error("either --address or --redis-uri is required")
+
+    work(queue, max_tasks=args.max_tasks)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,12 +1,81 @@
-from concurrent.futures import ProcessPoolExecutor, as_completed
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from queue import SimpleQueue
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
 from datagears.engine.api import EngineAPI, NetworkAPI
+from datagears.engine.backends import (Backend, LocalityBackend,
+                                       ProcessBackend, get_backend, then)
+from datagears.engine.cache import GearCache
+from datagears.engine.plan import RunState
+from datagears.engine.pool import WorkerPool
+from datagears.engine.shm import DEFAULT_THRESHOLD, SharedMemoryTransport
+from datagears.engine.trace import RunTrace
+from datagears.engine.worker import (EXECUTE_CHAIN, MAP_ROWS, ObjectRef,
+                                     execute_async, sizeof)
+
+
+def _batch_size(columns: dict) -> int:
+    """Returns the number of rows of columnar input data."""
+    sizes = set()
+    for name, column in columns.items():
+        if not hasattr(column, "__len__") or isinstance(column, (str, bytes, dict)):
+            raise ValueError(f"batch input `{name}` must be a list or an array")
+        sizes.add(len(column))
+
+    if len(sizes) != 1:
+        raise ValueError("batch inputs must be non-empty columns of equal length")
+
+    return sizes.pop()
+
+
+def _concat(futures: List[Future]) -> Future:
+    """Combine futures of row chunks into a single future of all rows."""
+    if len(futures) == 1:
+        return futures[0]
+
+    combined: Future = Future()
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def chunk_done(_: Future) -> None:
+        with lock:
+            remaining[0] -= 1
+            if remaining[0]:
+                return
+
+        try:
+            combined.set_result([row for future in futures for row in future.result()])
+        except Exception as e:
+            combined.set_exception(e)
+
+    if not futures:
+        combined.set_result([])
+
+    for future in futures:
+        future.add_done_callback(chunk_done)
+
+    return combined
 
 
 class LocalEngine(EngineAPI):
     """Local engine executor."""
 
-    def __init__(self, compute: NetworkAPI, max_workers=4) -> None:
+    def __init__(
+        self,
+        compute: NetworkAPI,
+        pool: Optional[WorkerPool] = None,
+        backend: Union[str, Backend, None] = None,
+        cache: Optional[GearCache] = None,
+        chunk_size: int = 256,
+        trace: bool = False,
+        shared_memory: Union[bool, int] = False,
+        release: bool = True,
+        fuse: bool = False,
+    ) -> None:
         """Local engine constructor."""
         from datagears.engine.network import Gear, Network
 
@@ -14,60 +83,569 @@ class LocalEngine(EngineAPI):
             compute = Network(compute.name, outputs=[compute])
 
         self._network: Network = compute
-        self._max_workers: int = max_workers
-        self._executor = ProcessPoolExecutor(max_workers=self._max_workers)
+        self._plan = self._network.compile()
+        self._state: RunState = self._plan.new_run()
+        self._pool: WorkerPool = pool or WorkerPool.default()
+        self._cache: Optional[GearCache] = cache
+        self._chunk_size: int = chunk_size
+        self._batch_size: Optional[int] = None
+        self._tracing: bool = trace
+        self._output_all: bool = False
+        self._release: bool = release
+        self._fuse: bool = fuse
+        self._chains: Dict[int, Tuple[int, ...]] = {}
+        self._sizes: Dict[int, int] = {}
+        self._memory: int = 0
+        self._peak_memory: int = 0
+        self._transport: Optional[SharedMemoryTransport] = None
+        if shared_memory:
+            threshold = DEFAULT_THRESHOLD if shared_memory is True else shared_memory
+            self._transport = SharedMemoryTransport(threshold)
+        self._trace: Optional[RunTrace] = None
+        self._epoch: float = time.perf_counter()
+        self._started: Dict[int, float] = {}
+        self._finished: Dict[int, float] = {}
+
+        # NOTE: Backends by name, gears without a hint run on the default backend.
+        self._backends: Dict[str, Backend] = {
+            ProcessBackend.name: ProcessBackend(self._pool)
+        }
+        if isinstance(backend, Backend):
+            self._backends[backend.name] = backend
+            self._backend: Backend = backend
+        else:
+            self._backend = self._backend_named(backend or ProcessBackend.name)
+
+    @property
+    def _executor(self) -> ProcessPoolExecutor:
+        """Executor of the worker pool."""
+        return self._pool.executor
+
+    @property
+    def pool(self) -> WorkerPool:
+        """Worker pool used by the engine."""
+        return self._pool
+
+    @property
+    def backend(self) -> Backend:
+        """Default backend of the engine."""
+        return self._backend
+
+    def _backend_named(self, name: str) -> Backend:
+        """Returns backend of the given name, the process backend uses our pool."""
+        backend = self._backends.get(name)
+        if backend is None:
+            backend = self._backends[name] = get_backend(name)
+
+        return backend
+
+    @property
+    def _store(self) -> Optional[LocalityBackend]:
+        """Locality backend holding results of the run, if any gear uses it."""
+        backend = self._backends.get(LocalityBackend.name)
+        return backend if isinstance(backend, LocalityBackend) else None
+
+    def _release_refs(self, values) -> None:
+        """Drop results referenced by values from worker object stores."""
+        refs = [value for value in values if isinstance(value, ObjectRef)]
+        if refs:
+            self._store.release(refs)
+
+    def _backend_for(self, gear_id: int) -> Backend:
+        """Returns backend which executes the given gear."""
+        name = self._plan.backends[gear_id]
+        if name is None:
+            return self._backend
+
+        return self._backend_named(name)
+
+    @property
+    def state(self) -> RunState:
+        """Value store of the current run."""
+        return self._state
+
+    @property
+    def timings(self) -> Dict[str, Tuple[float, float]]:
+        """Start and end of every gear of the last run, seconds since its start."""
+        return {
+            self._plan.gear(gear_id).name: (start, self._finished[gear_id])
+            for gear_id, start in self._started.items()
+            if gear_id in self._finished
+        }
+
+    @property
+    def peak_memory(self) -> int:
+        """Estimated peak bytes of values held by the last run."""
+        return self._peak_memory
+
+    @property
+    def trace(self) -> Optional[RunTrace]:
+        """Trace of the last run, when tracing is enabled."""
+        return self._trace
+
+    def _submit(self, gear_id: int) -> Future:
+        """Submit a single gear to its backend."""
+        chain = self._chains.get(gear_id)
+        if chain is not None:
+            return self._submit_chain(chain)
+
+        # NOTE: Only the function reference and its own arguments cross the
+        # process boundary, never the gear and its graph.
+        backend = self._backend_for(gear_id)
+        target = self._plan.refs[gear_id]
+        kwargs = self._state.arguments(gear_id)
+
+        if self._batch_size is not None:
+            if not self._plan.vectorized[gear_id]:
+                return self._submit_rows(gear_id, backend, target, kwargs)
+        elif isinstance(backend, LocalityBackend):
+            # NOTE: Results stay in the worker which produced them, the run state
+            # only holds references to them.
+            return backend.submit_stored(target, kwargs)
+        elif self._store is not None and any(
+            isinstance(value, ObjectRef) for value in kwargs.values()
+        ):
+            return then(
+                self._store.gather(kwargs),
+                lambda kwargs: self._submit_call(gear_id, backend, target, kwargs),
+            )
+        elif self._transport is not None:
+            # NOTE: Large values stay in shared memory, worker processes receive
+            # handles and gears in this process receive zero-copy views.
+            if backend.remote:
+                target, kwargs = self._transport.call(target, kwargs)
+                return self._submit_call(gear_id, backend, target, kwargs, False)
+
+            kwargs = self._transport.resolve(kwargs)
+
+        return self._submit_call(gear_id, backend, target, kwargs)
+
+    def _submit_call(
+        self, gear_id: int, backend: Backend, target, kwargs, cacheable: bool = True
+    ) -> Future:
+        """Submit a call to the backend unless its result is cached."""
+        if self._trace is not None:
+            backend = self._trace.wrap(backend, self._plan.gear(gear_id).name)
+
+        if cacheable and self._cache is not None and self._plan.cacheable[gear_id]:
+            return self._cache.submit(backend, target, kwargs)
+
+        return backend.submit(target, kwargs)
+
+    def _submit_rows(self, gear_id: int, backend: Backend, target, columns) -> Future:
+        """Map a gear over batch rows, one task per chunk of rows."""
+        futures = []
+        for start in range(0, self._batch_size, self._chunk_size):
+            stop = min(start + self._chunk_size, self._batch_size)
+            chunk = {
+                "target": target,
+                "columns": {
+                    name: column[start:stop] for name, column in columns.items()
+                },
+                "size": stop - start,
+            }
+            futures.append(self._submit_call(gear_id, backend, MAP_ROWS, chunk))
+
+        return _concat(futures)
 
-        # TODO: self.shutdown(wait=True)
+    def _fusable(self, gear_id: int) -> bool:
+        """Check if a gear may run fused with its neighbours in a chain."""
+        plan = self._plan
+        fuse = plan.fuse[gear_id]
+        if not (self._fuse if fuse is None else fuse):
+            return False
 
-    def _submit_next(self) -> dict:
-        """Submit next batch of jobs to the pool."""
-        results = {}
-        futures = {}
+        cached = self._cache is not None and plan.cacheable[gear_id]
+        return not cached and not plan.coroutines[gear_id]
 
-        for data_node in self._network._compute_next():
-            predeccesors = list(self._network.graph.predecessors(data_node))
-            if len(predeccesors) != 1:
-                raise NotImplementedError(
-                    "found a compute node with multiple predecessors"
+    def _fuse_chains(self, outstanding: List[int]) -> Dict[int, Tuple[int, ...]]:
+        """Group outstanding linear chains of gears into tasks, keyed by head."""
+        plan = self._plan
+        if (
+            self._batch_size is not None
+            or self._output_all
+            or self._tracing
+            or self._transport is not None
+            or self._store is not None
+            or LocalityBackend.name in plan.backends
+        ):
+            return {}
+
+        # NOTE: A gear is linked to the parent it alone consumes, results of the
+        # parent never leave the worker and are not returned.
+        candidates, targets = set(outstanding), set(self._state.targets)
+        links: Dict[int, int] = {}
+        for gear_id in outstanding:
+            parent = plan.chained[gear_id]
+            if (
+                parent in candidates
+                and parent not in targets
+                and self._fusable(parent)
+                and self._fusable(gear_id)
+                and self._backend_for(parent) is self._backend_for(gear_id)
+            ):
+                links[parent] = gear_id
+
+        chains: Dict[int, Tuple[int, ...]] = {}
+        tails = set(links.values())
+        for head in links:
+            if head not in tails:
+                chain = [head]
+                while chain[-1] in links:
+                    chain.append(links[chain[-1]])
+                chains[head] = tuple(chain)
+
+        return chains
+
+    def _submit_chain(self, chain: Tuple[int, ...]) -> Future:
+        """Submit a fused chain of gears as a single task."""
+        plan, state = self._plan, self._state
+
+        steps = []
+        previous = None
+        for gear_id in chain:
+            kwargs, params = {}, []
+            for name, data_id in plan.bindings[gear_id]:
+                if data_id == previous:
+                    params.append(name)
+                else:
+                    kwargs[name] = state.values[data_id]
+
+            steps.append((plan.refs[gear_id], kwargs, tuple(params)))
+            previous = plan.gear_output[gear_id]
+
+        return self._backend_for(chain[0]).submit(EXECUTE_CHAIN, {"steps": steps})
+
+    def _prepare(self) -> Tuple[List[int], deque, Optional[Dict[int, int]]]:
+        """Count unresolved dependencies and consumers of outstanding gears."""
+        plan = self._plan
+        computed = self._state.computed
+        outstanding = self._state.outstanding
+
+        # NOTE: Fresh runs start from the dependency counts of the plan, results
+        # kept from earlier runs are only subtracted when there are any.
+        kept = any(computed)
+        pending = [0] * len(plan.gears)
+        for gear_id in outstanding:
+            pending[gear_id] = plan.dependencies[gear_id]
+            if kept:
+                pending[gear_id] -= sum(
+                    1
+                    for _, data_id in plan.bindings[gear_id]
+                    if data_id in plan.producer and computed[plan.producer[data_id]]
                 )
 
-            gear = predeccesors[0]
-            future = self._executor.submit(gear, kwargs=gear.input_values)
-            futures[future] = (data_node, gear)
+        ready = deque(gear_id for gear_id in outstanding if not pending[gear_id])
+        self._chains = self._fuse_chains(outstanding)
+
+        # NOTE: Outstanding consumers of every data node, values are freed once
+        # the last one finishes.
+        remaining: Optional[Dict[int, int]] = None
+        if self._release or self._transport is not None:
+            remaining = {}
+            for gear_id in outstanding:
+                for _, data_id in plan.bindings[gear_id]:
+                    remaining[data_id] = remaining.get(data_id, 0) + 1
+
+        return pending, ready, remaining
+
+    def _complete(
+        self,
+        gear_id: int,
+        value,
+        pending: List[int],
+        ready: deque,
+        remaining: Optional[Dict[int, int]],
+    ) -> None:
+        """Store the result of a gear and queue consumers which became ready."""
+        chain = self._chains.get(gear_id)
+        if chain is not None:
+            return self._complete_chain(chain, value, pending, ready, remaining)
 
-        for future in as_completed(futures):
-            data_node, gear = futures[future]
-            value = future.result()
+        plan = self._plan
+        self._release_refs([self._state.result(gear_id)])
+        self._state.set_result(gear_id, value)
+        self._finished[gear_id] = time.perf_counter() - self._epoch
+        self._account(plan.gear_output[gear_id])
 
-            data_node.set_value(value)
-            results[gear.name] = value
+        if remaining is not None:
+            self._release_values(gear_id, remaining)
 
-        return results
+        for consumer in plan.consumers[plan.gear_output[gear_id]]:
+            pending[consumer] -= 1
+            if not pending[consumer]:
+                ready.append(consumer)
+
+    def _complete_chain(
+        self,
+        chain: Tuple[int, ...],
+        value,
+        pending: List[int],
+        ready: deque,
+        remaining: Optional[Dict[int, int]],
+    ) -> None:
+        """Store the result of a fused chain, inner results count as freed."""
+        plan, state = self._plan, self._state
+        started = self._started[chain[0]]
+        for gear_id in chain[:-1]:
+            self._started[gear_id] = started
+            self._finished[gear_id] = time.perf_counter() - self._epoch
+            state.release(plan.gear_output[gear_id])
+
+            if remaining is not None:
+                self._release_values(gear_id, remaining)
+
+        self._started[chain[-1]] = started
+        self._complete(chain[-1], value, pending, ready, remaining)
+
+    def _schedule(self) -> None:
+        """Execute outstanding gears as soon as their last dependency resolves."""
+        pending, ready, remaining = self._prepare()
+        completed: SimpleQueue = SimpleQueue()
+        futures: Dict[Future, int] = {}
+
+        try:
+            while ready or futures:
+                while ready:
+                    gear_id = ready.popleft()
+                    self._started[gear_id] = time.perf_counter() - self._epoch
+                    future = self._submit(gear_id)
+                    futures[future] = gear_id
+                    future.add_done_callback(completed.put)
+
+                # NOTE: Block until any gear finishes, not the whole wave.
+                future = completed.get()
+                gear_id = futures.pop(future)
+                self._complete(gear_id, future.result(), pending, ready, remaining)
+        finally:
+            for future in futures:
+                future.cancel()
+
+            if self._transport is not None:
+                self._transport.release_later(futures)
+                self._transport.release_all()
+
+    async def _await_native(self, gear_id: int):
+        """Await a coroutine gear on the running event loop."""
+        kwargs = self._state.arguments(gear_id)
+        if self._store is not None:
+            kwargs = await asyncio.wrap_future(self._store.gather(kwargs))
+        if self._transport is not None:
+            kwargs = self._transport.resolve(kwargs)
+
+        return await execute_async(self._plan.refs[gear_id], kwargs)
+
+    async def _aschedule(self) -> None:
+        """Execute outstanding gears without blocking the running event loop."""
+        pending, ready, remaining = self._prepare()
+        running: Dict[asyncio.Future, int] = {}
+        calls: Dict[asyncio.Future, Future] = {}
+
+        try:
+            while ready or running:
+                while ready:
+                    gear_id = ready.popleft()
+                    self._started[gear_id] = time.perf_counter() - self._epoch
+
+                    # NOTE: Coroutine gears are awaited here instead of being
+                    # shipped to a backend.
+                    if self._batch_size is None and self._plan.coroutines[gear_id]:
+                        future = asyncio.ensure_future(self._await_native(gear_id))
+                    else:
+                        submitted = self._submit(gear_id)
+                        future = asyncio.wrap_future(submitted)
+                        calls[future] = submitted
+                    running[future] = gear_id
+
+                done, _ = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED
+                )
+                for future in done:
+                    gear_id = running.pop(future)
+                    calls.pop(future, None)
+                    self._complete(gear_id, future.result(), pending, ready, remaining)
+        finally:
+            for future in running:
+                future.cancel()
+
+            if self._transport is not None:
+                # NOTE: Calls still running in workers may produce segments after
+                # the run failed, they are freed as soon as they finish.
+                self._transport.release_later(calls.values())
+                self._transport.release_all()
+
+    def _account(self, data_id: int) -> None:
+        """Update memory held by the run after a value changed."""
+        value = self._state.values[data_id]
+        size = sizeof(value) if value is not None else 0
+
+        self._memory += size - self._sizes.get(data_id, 0)
+        self._sizes[data_id] = size
+        self._peak_memory = max(self._peak_memory, self._memory)
+
+    def _release_values(self, gear_id: int, remaining: Dict[int, int]) -> None:
+        """Free values whose consumers are all done."""
+        plan, state, transport = self._plan, self._state, self._transport
+        output_id = plan.gear_output[gear_id]
+        if transport is not None:
+            transport.track(state.values[output_id])
+
+        done = [output_id] if not remaining.get(output_id) else []
+        for _, data_id in plan.bindings[gear_id]:
+            if data_id in plan.producer:
+                remaining[data_id] -= 1
+                if not remaining[data_id]:
+                    done.append(data_id)
+
+        for data_id in done:
+            value = state.values[data_id]
+
+            if self._output_all or plan.producer[data_id] in state.targets:
+                if transport is not None:
+                    state.values[data_id] = transport.materialize(value)
+            elif self._release or transport.is_shared(value):
+                state.release(data_id)
+                self._release_refs([value])
+
+            if transport is not None:
+                transport.release(value)
+
+            self._account(data_id)
+
+    def _start(self) -> None:
+        """Reset per-run bookkeeping."""
+        self._epoch = time.perf_counter()
+        self._started, self._finished = {}, {}
+
+        self._sizes = {
+            data_id: sizeof(value)
+            for data_id, value in enumerate(self._state.values)
+            if value is not None
+        }
+        self._memory = self._peak_memory = sum(self._sizes.values())
+
+        if self._output_all:
+            # NOTE: Every result is returned, including freed intermediates.
+            self._state.dropped.clear()
+
+        if self._tracing:
+            self._trace = RunTrace(self._plan.name)
+
+    def _fetch(self, gear_ids) -> Future:
+        """Bring results kept by workers back into the run state."""
+        fetched: Future = Future()
+        plan, values = self._plan, self._state.values
+        refs = {
+            plan.gear_output[gear_id]: values[plan.gear_output[gear_id]]
+            for gear_id in gear_ids
+            if isinstance(values[plan.gear_output[gear_id]], ObjectRef)
+        }
+        if not refs:
+            fetched.set_result(None)
+            return fetched
+
+        def store(values_by_id: dict) -> Future:
+            for data_id, value in values_by_id.items():
+                values[data_id] = value
+            self._store.release(refs.values())
+
+            fetched.set_result(None)
+            return fetched
+
+        return then(self._store.gather(refs), store)
+
+    def _outputs(self, output_all: bool) -> Tuple[int, ...]:
+        """Returns gears whose results are returned."""
+        return self._plan.gears if output_all else self._state.targets
+
+    def _drop_stored(self) -> None:
+        """Drop results still kept by workers, they are recomputed when needed."""
+        state = self._state
+        stored = [
+            data_id
+            for data_id, value in enumerate(state.values)
+            if isinstance(value, ObjectRef)
+        ]
+        if stored:
+            self._release_refs([state.release(data_id) for data_id in stored])
+
+    def _collect(self, output_all: bool) -> dict:
+        """Collect results of the current run."""
+        self._fetch(self._outputs(output_all)).result()
+
+        # NOTE: Engines usually serve a single run, results left in worker
+        # object stores are freed now whatever the `release` setting.
+        self._drop_stored()
+
+        state = self._state
+        if output_all:
+            return state.results
+
+        return {
+            self._plan.gear(gear_id).name: state.result(gear_id)
+            for gear_id in state.targets
+        }
 
     def prepare(self) -> None:
         """Prepare the given computation for executor."""
         pass
 
-    def run(self, output_all=False, **kwargs) -> dict:
+    def _new_run(self, output_all: bool, outputs: Optional[Sequence]) -> None:
+        """Replace the run state, restricted to the cone of `outputs` if given."""
+        self._output_all = output_all
+        self._release_refs(self._state.values)
+
+        targets = self._plan.gear_ids(outputs) if outputs is not None else None
+        self._state = self._plan.new_run(targets)
+
+    def run(
+        self, output_all=False, outputs: Optional[Sequence] = None, **kwargs
+    ) -> dict:
         """Runs the computational network and returns the result object."""
-        self._network._set_input(kwargs)
+        self._new_run(output_all, outputs)
+        self._state.set_input(kwargs)
+        self._batch_size = None
 
-        results = {}
-        while True:
-            last_results = self._submit_next()
-            if not last_results:
-                break
+        self._start()
+        self._schedule()
+        return self._collect(output_all)
 
-            results.update(last_results)
+    async def arun(
+        self, output_all=False, outputs: Optional[Sequence] = None, **kwargs
+    ) -> dict:
+        """Runs the computational network without blocking the event loop."""
+        self._new_run(output_all, outputs)
+        self._state.set_input(kwargs)
+        self._batch_size = None
 
-        if output_all:
-            return results
+        self._start()
+        await self._aschedule()
+        await asyncio.wrap_future(self._fetch(self._outputs(output_all)))
+        return self._collect(output_all)
 
-        results_filter = {
-            fn.__name__: results[fn.__name__] for fn in self._network._outputting_nodes
-        }
-        return results_filter
+    def run_batch(
+        self, inputs: dict, output_all=False, outputs: Optional[Sequence] = None
+    ) -> dict:
+        """Runs the network once over columns of input rows."""
+        self._new_run(output_all, outputs)
+        self._state.set_input(inputs)
+        self._batch_size = _batch_size(inputs)
+
+        self._start()
+        self._schedule()
+        return self._collect(output_all)
 
-    def register():
+    def update(self, output_all=False, **kwargs) -> dict:
+        """Re-runs the network recomputing only gears affected by changed inputs."""
+        self._output_all = output_all
+        self._state.update_input(kwargs)
+
+        self._start()
+        self._schedule()
+        return self._collect(output_all)
+
+    def register(self) -> str:
         """Registers the computational network with RedisGears."""
-        raise NotImplementedError
+        from datagears.engine.registry import get_registry
+
+        return get_registry().register(self._network)
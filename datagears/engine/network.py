@@ -1,13 +1,18 @@
 import inspect
-from typing import Any, Callable, List, Optional, Tuple, Type, Union
+from types import MappingProxyType
+from typing import (Any, Callable, Dict, Iterator, List, Mapping, Optional,
+                    Set, Tuple, Type, Union)
 
 from networkx import MultiDiGraph
-from networkx.algorithms.dag import descendants
-from networkx.algorithms.traversal.breadth_first_search import bfs_edges
 
 from datagears.engine.api import (EngineAPI, NetworkAPI, NetworkPlotAPI,
                                   NetworkRunAPI)
+from datagears.engine.core import GraphCore
 from datagears.engine.nodes import Gear, GearInput, GearInputOutput, GearOutput
+from datagears.engine.plan import ExecutionPlan
+
+# NOTE: Keyword arguments of `Network.run` which can not name gear inputs.
+RESERVED_INPUTS = frozenset({"config", "output_all", "outputs"})
 
 
 class Depends:
@@ -28,13 +33,18 @@ class Depends:
 class NetworkPropertyMixin(NetworkAPI):
     """Network property mixin."""
 
-    def __init__(self, graph: MultiDiGraph) -> None:
+    def __init__(self, graph: GraphCore) -> None:
         """Network property mixin."""
         self._graph = graph
 
     @property
-    def graph(self):
+    def graph(self) -> MultiDiGraph:
         """Get computational graph representation."""
+        return self._graph.to_networkx()
+
+    @property
+    def core(self) -> GraphCore:
+        """Get compact graph used for compilation and execution."""
         return self._graph
 
     @property
@@ -42,7 +52,14 @@ class NetworkPropertyMixin(NetworkAPI):
         """Plot the network."""
         from datagears.engine.plot import NetworkPlot
 
-        return NetworkPlot(self._graph)
+        return NetworkPlot(self.graph)
+
+    def _nodes_of(self, *kinds: Type) -> List[Any]:
+        """Nodes of the given types, cached until the graph changes."""
+        key = "nodes:" + ",".join(kind.__name__ for kind in kinds)
+        return self._graph.cached(
+            key, lambda: [node for node in self._graph.nodes if isinstance(node, kinds)]
+        )
 
     @property
     def roots(self) -> list:
@@ -50,46 +67,81 @@ class NetworkPropertyMixin(NetworkAPI):
 
         def check_predecessors(node):
             """Checks predecessors of a node."""
-            if not isinstance(node, Gear):
-                return False
-
             pred_ = self._graph.predecessors(node)
             all_inputs = [True if isinstance(p, GearInput) else False for p in pred_]
 
             return all(all_inputs) or not all_inputs
 
-        roots = [node for node in self._graph.nodes if check_predecessors(node)]
+        def compute():
+            return [node for node in self._nodes_of(Gear) if check_predecessors(node)]
+
+        return list(self._graph.cached("roots", compute))
+
+    @property
+    def _plan(self) -> ExecutionPlan:
+        """Execution plan of the graph, compiled once until the graph changes."""
+        return self._graph.cached("plan", lambda: ExecutionPlan(self))
+
+    @property
+    def input_nodes(self) -> Mapping[str, Tuple[GearInput, ...]]:
+        """Input nodes by input name."""
+
+        def compute():
+            plan = self._plan
+            return MappingProxyType(
+                {
+                    name: tuple(plan.nodes[data_id] for data_id in ids)
+                    for name, ids in plan.input_ids.items()
+                }
+            )
+
+        return self._graph.cached("input_nodes", compute)
+
+    @property
+    def gear_outputs(self) -> Mapping[Gear, Union[GearOutput, GearInputOutput]]:
+        """Output node of every gear."""
+
+        def compute():
+            plan = self._plan
+            return MappingProxyType(
+                {
+                    plan.nodes[gear_id]: plan.nodes[plan.gear_output[gear_id]]
+                    for gear_id in plan.gears
+                }
+            )
+
+        return self._graph.cached("gear_outputs", compute)
+
+    @property
+    def levels(self) -> Tuple[Tuple[Gear, ...], ...]:
+        """Gears grouped by their longest distance from the inputs."""
+
+        def compute():
+            plan = self._plan
+            return tuple(
+                tuple(plan.nodes[gear_id] for gear_id in level) for level in plan.levels
+            )
 
-        return roots
+        return self._graph.cached("levels", compute)
 
     @property
     def input_shape(self) -> dict:
         """Returns input shape of the computational graph."""
-        inputs = {
-            node.name: node.annotation
-            for node in self._graph.nodes
-            if isinstance(node, GearInput)
-        }
-        return inputs
+
+        def compute():
+            return {node.name: node.annotation for node in self._nodes_of(GearInput)}
+
+        return dict(self._graph.cached("input_shape", compute))
 
     @property
     def inputs(self) -> dict:
         """Return all inputs with values of a graph."""
-        inputs = {
-            node.name: node.value
-            for node in self._graph.nodes
-            if isinstance(node, GearInput)
-        }
-        return inputs
+        return {node.name: node.value for node in self._nodes_of(GearInput)}
 
     @property
     def outputs(self) -> dict:
         """Return all outputs of a graph."""
-        outputs = [
-            node
-            for node in self._graph.nodes
-            if isinstance(node, GearInputOutput) or isinstance(node, GearOutput)
-        ]
+        outputs = self._nodes_of(GearInputOutput, GearOutput)
         return {str(out): out.value for out in outputs}
 
 
@@ -100,21 +152,102 @@ class NetworkRun(NetworkRunAPI, NetworkPropertyMixin):
         engine: Type[EngineAPI],
         config: dict = {},
         output_all: bool = False,
-        **kwargs,
+        batch: Optional[dict] = None,
+        deferred: bool = False,
+        outputs: Optional[List[Callable]] = None,
+        inputs: Optional[dict] = None,
     ) -> None:
         """Network run constructor."""
         self._network = network
         self._output_all = output_all
-        self._engine = engine(self._network, **config)
-        self._result = self._engine.run(output_all=output_all, **kwargs)
+        self._outputs = outputs
+
+        # NOTE: Runs can be updated, intermediate results are kept for reuse
+        # unless early release is asked for explicitly.
+        self._engine = engine(self._network, **{"release": False, **config})
+        self._result = None
+
+        if batch is not None:
+            self._result = self._engine.run_batch(
+                batch, output_all=output_all, outputs=outputs
+            )
+        elif not deferred:
+            self._result = self._engine.run(
+                output_all=output_all, outputs=outputs, **(inputs or {})
+            )
+
+        super().__init__(self._network.core)
 
-        super().__init__(self._network.graph)
+    async def _arun(self, inputs: dict) -> "NetworkRun":
+        """Run a deferred run on the running event loop."""
+        self._result = await self._engine.arun(
+            output_all=self._output_all, outputs=self._outputs, **inputs
+        )
+        return self
+
+    @property
+    def _state(self):
+        """Run state of the engine."""
+        return self._engine.state
 
     @property
     def result(self):
         """Return compution result."""
         return self._result
 
+    @property
+    def timings(self) -> Dict[str, Tuple[float, float]]:
+        """Return start and end time of every gear, seconds since the run start."""
+        return self._engine.timings
+
+    @property
+    def peak_memory(self) -> int:
+        """Return estimated peak bytes of values held during the run."""
+        return self._engine.peak_memory
+
+    @property
+    def graph(self) -> MultiDiGraph:
+        """Get computational graph with data node values of the run."""
+        state = self._state
+        graph = MultiDiGraph(self._graph.to_networkx())
+        for data_id in range(len(state.plan.gears), len(state.plan.nodes)):
+            graph.nodes[state.plan.nodes[data_id]]["value"] = state.values[data_id]
+
+        return graph
+
+    @property
+    def plot(self) -> NetworkPlotAPI:
+        """Plot the network run with timings and its critical path."""
+        from datagears.engine.plot import NetworkPlot
+
+        return NetworkPlot(self.graph, timings=self.timings)
+
+    @property
+    def trace(self):
+        """Return per-gear trace of the run, enabled with `config={"trace": True}`."""
+        return self._engine.trace
+
+    def _set_input(self, input_data: dict) -> Set:
+        """Change run inputs and invalidate their downstream gears."""
+        return self._state.update_input(input_data)
+
+    def update(self, **kwargs) -> dict:
+        """Re-run with changed inputs, reusing results of unaffected gears."""
+        self._set_input(kwargs)
+        self._result = self._engine.update(output_all=self._output_all)
+
+        return self._result
+
+    @property
+    def inputs(self) -> dict:
+        """Return all inputs with values of the run."""
+        return self._state.inputs
+
+    @property
+    def outputs(self) -> dict:
+        """Return all outputs of the run."""
+        return self._state.outputs
+
 
 class Network(NetworkPropertyMixin):
     """Representation of a DAG which contains all processing data."""
@@ -122,57 +255,47 @@ class Network(NetworkPropertyMixin):
     def __init__(self, name: str, outputs: Optional[List[Callable]] = None) -> None:
         """Network constructor."""
         self._outputting_nodes = outputs or []
-        self._graph: MultiDiGraph = MultiDiGraph(name=name)
+        self._graph: GraphCore = GraphCore(name)
+
+        # NOTE: Gears are canonicalized by function identity, each function maps to
+        # a single gear with a single output node fanned out to all its consumers.
+        self._gears: Dict[Callable, Gear] = {}
+        self._gear_outputs: Dict[Gear, Union[GearOutput, GearInputOutput]] = {}
 
-        for output in self._outputting_nodes:
-            gear = Gear(output, graph=self._graph)
-            self._attach_output(gear, graph_output=True)
+        output_gears = [
+            self._register_gear(output, graph_output=True)
+            for output in dict.fromkeys(self._outputting_nodes)
+        ]
+        for gear in output_gears:
             self._add_gear(gear)
 
         super().__init__(self._graph)
 
     def _set_input(self, input_data: dict):
         """Set input data for the graph computation."""
-        if input_data.keys() != self.input_shape.keys():
+        inputs = self.input_nodes
+        if input_data.keys() != inputs.keys():
             raise ValueError("input data is wrong format - check `network.input_shape`")
 
-        inputs = {
-            node.name: node for node in self._graph.nodes if isinstance(node, GearInput)
-        }
-
         for name, value in input_data.items():
-            inputs[name].set_value(value)
-
-    def _compute_next(self) -> List:
-        """Returns next nodes for execution."""
-        # NOTE: Find all nodes of type `GearOutput`.
-        outputs = {
-            dst
-            for r in self.roots
-            for src, dst in bfs_edges(self._graph, r)
-            if (isinstance(dst, GearOutput) or isinstance(dst, GearInputOutput))
-            and dst.is_empty
-        }
-
-        # NOTE: For each `GearOutput`, build set of descendants.
-        reachable = {
-            node for output in outputs for node in descendants(self._graph, output)
-        }
-
-        # NOTE: For each `GearOutput`, exclude its connected descendant of the same type.
-        result = [node for node in outputs if node not in reachable]
-
-        return result
+            for node in inputs[name]:
+                node.set_value(value)
 
     def _attach_input(self, param: inspect.Parameter, dst: Gear) -> GearInput:
         """Attach input to the gear."""
+        if param.name in RESERVED_INPUTS:
+            raise ValueError(
+                f"gear `{dst.name}` input `{param.name}` clashes with an argument of"
+                " `Network.run`, rename the parameter"
+            )
+
         value = param.default if param.default != param.empty else None
         annotation = param.annotation if param.annotation != param.empty else Any
 
         gear_input = GearInput(
             param.name, value, annotation=annotation, graph=self._graph
         )
-        self._graph.add_edge(gear_input, dst)
+        self._graph.add_edge(gear_input, dst, param=param.name)
 
     def _attach_output(
         self, src_gear: Gear, name: str = None, graph_output: bool = False
@@ -193,25 +316,123 @@ class Network(NetworkPropertyMixin):
         self._graph.add_edge(src_gear, src_gear_output)
         return src_gear_output
 
+    def _register_gear(self, func: Callable, graph_output: bool = False) -> Gear:
+        """Create the gear of a function together with its output node."""
+        gear = Gear(func, graph=self._graph)
+        self._gears[func] = gear
+        self._gear_outputs[gear] = self._attach_output(gear, graph_output=graph_output)
+
+        return gear
+
     def _add_gear(self, gear: Gear):
-        """Add gear to the graph."""
-        gear.set_graph(self._graph)
-
-        for name, param in gear.params.items():
-            if param.default and isinstance(param.default, Depends):
-                src_gear = param.default.gear
-                src_gear_output = self._attach_output(src_gear, name=name)
-                self._graph.add_edge(src_gear_output, gear)
-                self._add_gear(src_gear)
-            else:
+        """Add gear and all its dependencies to the graph."""
+        # NOTE: Expanded with an explicit stack so deep chains do not hit the
+        # recursion limit.
+        stack = [gear]
+        while stack:
+            gear = stack.pop()
+            gear.set_graph(self._graph)
+
+            for name, func in gear.dependencies:
+                src_gear = self._gears.get(func)
+                if src_gear is None:
+                    src_gear = self._register_gear(func)
+                    stack.append(src_gear)
+
+                src_gear_output = self._gear_outputs[src_gear]
+                self._graph.add_edge(src_gear_output, gear, param=name)
+
+            for param in gear.inputs:
                 self._attach_input(param, gear)
 
     def copy(self) -> "Network":
         """Create a copy of an `Network` instance."""
         return Network(self._graph.name, outputs=self._outputting_nodes)
 
-    def run(self, output_all=False, **kwargs) -> NetworkRunAPI:
-        """Run computation."""
+    def compile(self) -> ExecutionPlan:
+        """Compile the network into a reusable execution plan."""
+        return self._plan
+
+    def run(
+        self,
+        output_all: bool = False,
+        config: Optional[dict] = None,
+        outputs: Optional[List[Callable]] = None,
+        **kwargs,
+    ) -> NetworkRunAPI:
+        """Run computation, only of the gears needed for `outputs` if given."""
+        from datagears.engine.engine import LocalEngine
+
+        return NetworkRun(
+            self,
+            LocalEngine,
+            config=config or {},
+            output_all=output_all,
+            outputs=outputs,
+            inputs=kwargs,
+        )
+
+    async def arun(
+        self,
+        output_all: bool = False,
+        config: Optional[dict] = None,
+        outputs: Optional[List[Callable]] = None,
+        **kwargs,
+    ) -> NetworkRunAPI:
+        """Run computation without blocking the running event loop."""
         from datagears.engine.engine import LocalEngine
 
-        return NetworkRun(self.copy(), LocalEngine, output_all=output_all, **kwargs)
+        run = NetworkRun(
+            self,
+            LocalEngine,
+            config=config or {},
+            output_all=output_all,
+            deferred=True,
+            outputs=outputs,
+        )
+        return await run._arun(kwargs)
+
+    def serve(self, config: Optional[dict] = None, **options):
+        """Serving front-end coalescing and micro-batching concurrent runs."""
+        from datagears.engine.serving import NetworkServer
+
+        return NetworkServer(self, config=config, **options)
+
+    def register(self, config: Optional[dict] = None) -> str:
+        """Register the network so other processes can fetch it by name."""
+        from datagears.engine.engine import LocalEngine
+
+        return LocalEngine(self, **(config or {})).register()
+
+    def stream(
+        self, output_all: bool = False, config: Optional[dict] = None, **kwargs
+    ) -> Iterator[dict]:
+        """Run computation as a pipeline, yielding results of streaming gears."""
+        from datagears.engine.stream import StreamEngine
+
+        engine = StreamEngine(self, **(config or {}))
+        return engine.run(output_all=output_all, **kwargs)
+
+    def run_batch(
+        self,
+        inputs: dict,
+        output_all: bool = False,
+        chunk_size: Optional[int] = None,
+        config: Optional[dict] = None,
+        outputs: Optional[List[Callable]] = None,
+    ) -> NetworkRunAPI:
+        """Run computation over columns of inputs keyed by `input_shape` names."""
+        from datagears.engine.engine import LocalEngine
+
+        config = dict(config or {})
+        if chunk_size is not None:
+            config["chunk_size"] = chunk_size
+
+        return NetworkRun(
+            self,
+            LocalEngine,
+            config=config,
+            output_all=output_all,
+            batch=inputs,
+            outputs=outputs,
+        )
@@ -1,37 +1,46 @@
-from dataclasses import dataclass
+from functools import partial
 from typing import Any, Callable, Optional, Type
 
-from networkx.classes.multidigraph import MultiDiGraph
-
 from datagears.engine.analysis import Signature
+from datagears.engine.core import GraphCore
 
 
 class GearException(Exception):
     """Gear exception."""
 
     def __init__(self, **kwargs: Optional[Any]) -> None:
-        """"Gear exception constructor."""
+        """Gear exception constructor."""
         self.gear = kwargs["gear"]
         self.params = kwargs["params"]
         self.raised_exception = kwargs["raised_exception"]
 
         super().__init__(self.raised_exception)
 
+    def __reduce__(self):
+        """Pickle support for exceptions raised in worker processes."""
+        rebuild = partial(
+            GearException,
+            gear=self.gear,
+            params=self.params,
+            raised_exception=self.raised_exception,
+        )
+        return rebuild, ()
+
 
 class Gear(Signature):
     """Node representing data transformation."""
 
+    __slots__ = ("_graph",)
+
     shape = "circle"
 
-    def __init__(self, func: Callable, graph: MultiDiGraph = None) -> None:
+    def __init__(self, func: Callable, graph: GraphCore = None) -> None:
         """Gear constructor."""
-        self._graph: MultiDiGraph = graph
+        self._graph: GraphCore = graph
         super().__init__(func)
 
-    def __call__(self, *args: Any, **kwds: Any) -> Any:
-        """Execute the given callable with in going nodes as parameters."""
-        params = self.input_values
-
+    def __call__(self, **params: Any) -> Any:
+        """Execute the given callable with resolved input values as parameters."""
         try:
             result = self._func(**params)
         except (Exception, BaseException) as e:
@@ -50,7 +59,10 @@ class Gear(Signature):
     @property
     def input_values(self) -> dict:
         """Input values for the gear computation."""
-        params = {p.name: p.value for p in self._graph.predecessors(self)}
+        params = {
+            param: src.value
+            for src, _, param in self._graph.in_edges(self, data="param")
+        }
         return params
 
     def set_graph(self, graph):
@@ -61,37 +73,44 @@ class Gear(Signature):
 class Data:
     """Common operations for data nodes."""
 
+    __slots__ = ("_name", "_value", "_annotation", "_graph")
+
     def __init__(
         self,
         name: str,
         value: Optional[Any],
         annotation: Type = Any,
-        graph: MultiDiGraph = None,
+        graph: GraphCore = None,
     ):
         """Gear input constructor."""
         self._name: str = name
         self._value: Optional[Any] = value
         self._annotation: Type = annotation
-        self._graph: MultiDiGraph = graph
+        self._graph: GraphCore = graph
 
     def __repr__(self) -> str:
         """String representation."""
+        return self.label(self._value)
+
+    def label(self, value: Any) -> str:
+        """String representation holding the given value."""
         suffix = ")"
         annotation = self._annotation
 
         if hasattr(self._annotation, "__name__"):
             annotation = self._annotation.__name__
 
-        successors = list(self._graph.successors(self))
+        name = self._name
+        successors = list(self._graph.out_edges(self, data="param"))
         if not successors:
             child_out = self._graph.name
         else:
-            child = successors[0]
+            _, child, name = successors[0]
             child_out = child.name
             if len(child.params) > 1:
                 suffix = ", ...)"
 
-        return f"{child_out}({self._name}[{annotation}] = {self._value}{suffix}"
+        return f"{child_out}({name}[{annotation}] = {value}{suffix}"
 
     @property
     def name(self) -> str:
@@ -125,16 +144,22 @@ class Data:
 class GearInput(Data):
     """Input to the gear."""
 
+    __slots__ = ()
+
     shape = "invhouse"
 
 
 class GearOutput(Data):
     """Output of a gear without additional depedency."""
 
+    __slots__ = ()
+
     shape = "house"
 
 
 class GearInputOutput(Data):
     """Gear input and output node."""
 
+    __slots__ = ()
+
     shape = "note"
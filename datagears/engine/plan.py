@@ -0,0 +1,379 @@
+import inspect
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from datagears.engine.nodes import Gear, GearInput, GearInputOutput, GearOutput
+from datagears.engine.worker import function_ref
+
+
+class ExecutionPlan:
+    """Immutable execution plan compiled from a network."""
+
+    __slots__ = (
+        "name",
+        "nodes",
+        "index",
+        "gears",
+        "levels",
+        "refs",
+        "backends",
+        "cacheable",
+        "vectorized",
+        "coroutines",
+        "fuse",
+        "chained",
+        "bindings",
+        "dependencies",
+        "gear_output",
+        "producer",
+        "consumers",
+        "input_ids",
+        "output_gears",
+    )
+
+    def __init__(self, network) -> None:
+        """Compile the graph of a network into integer indexed tables."""
+        graph = network.core
+
+        # NOTE: Gears are numbered in topological order, data nodes follow them.
+        gears = [
+            graph.node(node_id)
+            for node_id in graph.topological_order()
+            if isinstance(graph.node(node_id), Gear)
+        ]
+        data = [node for node in graph.nodes if not isinstance(node, Gear)]
+        nodes = tuple(gears + data)
+        index = {node: idx for idx, node in enumerate(nodes)}
+
+        bindings: List[Tuple[Tuple[str, int], ...]] = []
+        gear_output: List[int] = []
+        producer: Dict[int, int] = {}
+        consumers: Dict[int, List[int]] = {index[node]: [] for node in data}
+
+        for gear_id, gear in enumerate(gears):
+            binding = []
+            for src, _, param in graph.in_edges(gear, data="param"):
+                binding.append((param, index[src]))
+                consumers[index[src]].append(gear_id)
+            bindings.append(tuple(binding))
+
+            successors = list(graph.successors(gear))
+            if len(successors) != 1:
+                raise NotImplementedError(
+                    f"gear `{gear.name}` must have exactly one output node"
+                )
+
+            output_id = index[successors[0]]
+            gear_output.append(output_id)
+            producer[output_id] = gear_id
+
+        input_ids: Dict[str, List[int]] = {}
+        for node in data:
+            if isinstance(node, GearInput):
+                input_ids.setdefault(node.name, []).append(index[node])
+
+        self.name: str = graph.name
+        self.nodes: Tuple[Any, ...] = nodes
+        self.index: Dict[Any, int] = index
+        self.gears: Tuple[int, ...] = tuple(range(len(gears)))
+        self.levels: Tuple[Tuple[int, ...], ...] = self._compute_levels(
+            bindings, producer
+        )
+        self.refs: Tuple[Any, ...] = tuple(function_ref(gear._func) for gear in gears)
+        self.backends: Tuple[Optional[str], ...] = tuple(
+            gear.hints.get("backend") for gear in gears
+        )
+        self.cacheable: Tuple[bool, ...] = tuple(
+            gear.hints.get("cache", True) for gear in gears
+        )
+        self.vectorized: Tuple[bool, ...] = tuple(
+            bool(gear.hints.get("vectorized")) for gear in gears
+        )
+        self.coroutines: Tuple[bool, ...] = tuple(
+            inspect.iscoroutinefunction(gear._func) for gear in gears
+        )
+        self.fuse: Tuple[Optional[bool], ...] = tuple(
+            gear.hints.get("fuse") for gear in gears
+        )
+        self.bindings: Tuple[Tuple[Tuple[str, int], ...], ...] = tuple(bindings)
+        self.dependencies: Tuple[int, ...] = tuple(
+            sum(1 for _, data_id in binding if data_id in producer)
+            for binding in bindings
+        )
+        self.gear_output: Tuple[int, ...] = tuple(gear_output)
+        self.producer: Dict[int, int] = producer
+        self.consumers: Dict[int, Tuple[int, ...]] = {
+            data_id: tuple(gear_ids) for data_id, gear_ids in consumers.items()
+        }
+        self.input_ids: Dict[str, Tuple[int, ...]] = {
+            name: tuple(ids) for name, ids in input_ids.items()
+        }
+        self.chained: Tuple[Optional[int], ...] = self._compute_chained(
+            bindings, producer, consumers, gear_output
+        )
+        self.output_gears: Tuple[int, ...] = tuple(
+            gear_id
+            for gear_id, output_id in enumerate(gear_output)
+            if isinstance(nodes[output_id], GearOutput)
+        )
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Plans are immutable once compiled."""
+        if hasattr(self, name):
+            raise AttributeError(f"execution plan attribute `{name}` is read-only")
+
+        super().__setattr__(name, value)
+
+    def __repr__(self) -> str:
+        """String representation of a plan."""
+        return f"ExecutionPlan({self.name}, gears={len(self.gears)})"
+
+    @staticmethod
+    def _compute_levels(bindings, producer) -> Tuple[Tuple[int, ...], ...]:
+        """Group gears by their longest distance from the inputs."""
+        depth: List[int] = []
+        for binding in bindings:
+            parents = [
+                depth[producer[data_id]]
+                for _, data_id in binding
+                if data_id in producer
+            ]
+            depth.append(max(parents) + 1 if parents else 0)
+
+        levels: List[List[int]] = [[] for _ in range(max(depth, default=-1) + 1)]
+        for gear_id, level in enumerate(depth):
+            levels[level].append(gear_id)
+
+        return tuple(tuple(level) for level in levels)
+
+    @staticmethod
+    def _compute_chained(
+        bindings, producer, consumers, gear_output
+    ) -> Tuple[Optional[int], ...]:
+        """Find the gear whose result only a given gear depends on, if any."""
+        chained: List[Optional[int]] = []
+        for binding in bindings:
+            parents = {
+                producer[data_id] for _, data_id in binding if data_id in producer
+            }
+            parent = parents.pop() if len(parents) == 1 else None
+
+            # NOTE: A link is linear only when no other gear consumes the result.
+            if parent is not None and len(set(consumers[gear_output[parent]])) != 1:
+                parent = None
+            chained.append(parent)
+
+        return tuple(chained)
+
+    @property
+    def input_shape(self) -> dict:
+        """Returns input shape of the plan."""
+        return {
+            name: self.nodes[ids[0]].annotation for name, ids in self.input_ids.items()
+        }
+
+    def gear(self, gear_id: int) -> Gear:
+        """Returns gear for the given id."""
+        return self.nodes[gear_id]
+
+    def new_run(self, targets: Optional[Tuple[int, ...]] = None) -> "RunState":
+        """Allocate a fresh value store for a single run."""
+        return RunState(self, targets)
+
+    def gear_ids(self, outputs) -> Tuple[int, ...]:
+        """Returns ids of gears given by their function or name."""
+        gear_ids = {}
+        for gear_id in self.gears:
+            gear = self.nodes[gear_id]
+            gear_ids[gear._func] = gear_id
+            gear_ids.setdefault(gear.name, gear_id)
+
+        try:
+            return tuple(dict.fromkeys(gear_ids[output] for output in outputs))
+        except KeyError as e:
+            raise ValueError(f"network `{self.name}` has no gear {e}") from None
+
+    def upstream(self, gear_ids) -> Set[int]:
+        """Returns the given gears and all gears they transitively depend on."""
+        cone: Set[int] = set(gear_ids)
+        stack = list(cone)
+
+        while stack:
+            for _, data_id in self.bindings[stack.pop()]:
+                gear_id = self.producer.get(data_id)
+                if gear_id is not None and gear_id not in cone:
+                    cone.add(gear_id)
+                    stack.append(gear_id)
+
+        return cone
+
+    def input_names(self, gear_ids) -> Set[str]:
+        """Returns names of inputs consumed by the given gears."""
+        return {
+            self.nodes[data_id].name
+            for gear_id in gear_ids
+            for _, data_id in self.bindings[gear_id]
+            if data_id not in self.producer
+        }
+
+    def downstream(self, data_ids) -> Set[int]:
+        """Returns all gears which transitively consume the given data nodes."""
+        cone: Set[int] = set()
+        stack = list(data_ids)
+
+        while stack:
+            for gear_id in self.consumers[stack.pop()]:
+                if gear_id not in cone:
+                    cone.add(gear_id)
+                    stack.append(self.gear_output[gear_id])
+
+        return cone
+
+
+class RunState:
+    """Per-run value store of an execution plan."""
+
+    __slots__ = ("plan", "values", "computed", "dropped", "targets", "cone")
+
+    def __init__(
+        self, plan: ExecutionPlan, targets: Optional[Tuple[int, ...]] = None
+    ) -> None:
+        """Run state constructor."""
+        self.plan: ExecutionPlan = plan
+        self.values: List[Any] = [None] * len(plan.nodes)
+        self.computed: List[bool] = [False] * len(plan.gears)
+
+        # NOTE: Gears whose results were freed after all consumers used them.
+        self.dropped: Set[int] = set()
+
+        # NOTE: Gears whose results are returned, runs for a subset of them only
+        # execute their ancestor cone.
+        self.targets: Tuple[int, ...] = plan.output_gears
+        self.cone: Optional[Set[int]] = None
+        if targets is not None:
+            self.targets = tuple(targets)
+            self.cone = plan.upstream(targets)
+
+    @property
+    def required_inputs(self) -> Set[str]:
+        """Returns names of inputs needed by the gears of the run."""
+        if self.cone is None:
+            return set(self.plan.input_ids)
+
+        return self.plan.input_names(self.cone)
+
+    def set_input(self, input_data: dict) -> None:
+        """Set input data for the run."""
+        unknown = input_data.keys() - self.plan.input_ids.keys()
+        if unknown or not self.required_inputs <= input_data.keys():
+            raise ValueError("input data is wrong format - check `network.input_shape`")
+
+        for name, value in input_data.items():
+            for data_id in self.plan.input_ids[name]:
+                self.values[data_id] = value
+
+    def update_input(self, input_data: dict) -> Set[int]:
+        """Change some inputs and invalidate the gears downstream of them."""
+        unknown = input_data.keys() - self.plan.input_ids.keys()
+        if unknown:
+            raise ValueError(f"unknown inputs {sorted(unknown)} - check `input_shape`")
+
+        changed = []
+        for name, value in input_data.items():
+            for data_id in self.plan.input_ids[name]:
+                if not _same(self.values[data_id], value):
+                    self.values[data_id] = value
+                    changed.append(data_id)
+
+        invalidated = self.plan.downstream(changed)
+        for gear_id in invalidated:
+            self.computed[gear_id] = False
+        self.dropped -= invalidated
+
+        return invalidated
+
+    def arguments(self, gear_id: int) -> dict:
+        """Resolve call arguments of a gear from the value store."""
+        values = self.values
+        return {name: values[data_id] for name, data_id in self.plan.bindings[gear_id]}
+
+    def set_result(self, gear_id: int, value: Any) -> None:
+        """Store result of a gear computation."""
+        self.values[self.plan.gear_output[gear_id]] = value
+        self.computed[gear_id] = True
+        self.dropped.discard(gear_id)
+
+    def release(self, data_id: int) -> Any:
+        """Free an intermediate result, it is recomputed once needed again."""
+        value, self.values[data_id] = self.values[data_id], None
+
+        gear_id = self.plan.producer[data_id]
+        self.computed[gear_id] = False
+        self.dropped.add(gear_id)
+
+        return value
+
+    def result(self, gear_id: int) -> Any:
+        """Returns stored result of a gear."""
+        return self.values[self.plan.gear_output[gear_id]]
+
+    @property
+    def outstanding(self) -> List[int]:
+        """Returns gears which still need to be computed."""
+        cone = self.cone
+        outstanding = [
+            gear_id
+            for gear_id, done in enumerate(self.computed)
+            if not done
+            and gear_id not in self.dropped
+            and (cone is None or gear_id in cone)
+        ]
+        if not self.dropped:
+            return outstanding
+
+        # NOTE: Freed results are recomputed only for consumers which run again.
+        plan = self.plan
+        needed = set(outstanding)
+        while outstanding:
+            for _, data_id in plan.bindings[outstanding.pop()]:
+                gear_id = plan.producer.get(data_id)
+                if gear_id in self.dropped and gear_id not in needed:
+                    needed.add(gear_id)
+                    outstanding.append(gear_id)
+
+        return sorted(needed)
+
+    @property
+    def results(self) -> dict:
+        """Return results of all computed gears."""
+        return {
+            self.plan.gear(gear_id).name: self.result(gear_id)
+            for gear_id, done in enumerate(self.computed)
+            if done
+        }
+
+    @property
+    def inputs(self) -> dict:
+        """Return all inputs with values of the run."""
+        return {name: self.values[ids[0]] for name, ids in self.plan.input_ids.items()}
+
+    @property
+    def outputs(self) -> dict:
+        """Return all outputs of the run."""
+        nodes = self.plan.nodes
+        return {
+            nodes[gear_id].name: self.values[data_id]
+            for data_id, gear_id in self.plan.producer.items()
+            if isinstance(nodes[data_id], (GearOutput, GearInputOutput))
+        }
+
+
+def _same(old: Any, new: Any) -> bool:
+    """Check if an input value is unchanged."""
+    if old is new:
+        return True
+
+    try:
+        return bool(old == new)
+    except Exception:
+        # NOTE: Values without a scalar equality (e.g. arrays) count as changed.
+        return False
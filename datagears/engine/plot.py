@@ -1,29 +1,158 @@
+from typing import Dict, List, Optional, Tuple
+
 import networkx
 
+from datagears.engine.nodes import Gear
+
+
+def _gear_dependencies(graph: networkx.DiGraph) -> Dict[Gear, List[Gear]]:
+    """Map each gear to the gears producing its inputs."""
+    return {
+        gear: [
+            producer
+            for data in graph.predecessors(gear)
+            for producer in graph.predecessors(data)
+        ]
+        for gear in graph.nodes
+        if isinstance(gear, Gear)
+    }
+
+
+def critical_path(
+    graph: networkx.DiGraph, timings: Dict[str, Tuple[float, float]]
+) -> Tuple[List[str], Dict[str, float]]:
+    """Returns the critical path of a run and the slack of every gear."""
+    dependencies = _gear_dependencies(graph)
+    order = [gear for gear in networkx.topological_sort(graph) if gear in dependencies]
+    elapsed = {
+        gear: (
+            timings[gear.name][1] - timings[gear.name][0]
+            if gear.name in timings
+            else 0.0
+        )
+        for gear in order
+    }
+
+    # NOTE: Forward pass computes earliest finish, backward pass latest finish.
+    finish: Dict[Gear, float] = {}
+    for gear in order:
+        start = max((finish[dep] for dep in dependencies[gear]), default=0.0)
+        finish[gear] = start + elapsed[gear]
+
+    if not order:
+        return [], {}
+
+    makespan = max(finish.values())
+    latest: Dict[Gear, float] = {gear: makespan for gear in order}
+    for gear in reversed(order):
+        for dep in dependencies[gear]:
+            latest[dep] = min(latest[dep], latest[gear] - elapsed[gear])
+
+    slack = {gear.name: max(0.0, latest[gear] - finish[gear]) for gear in order}
+
+    path = [max(order, key=lambda gear: finish[gear])]
+    while dependencies[path[-1]]:
+        path.append(max(dependencies[path[-1]], key=lambda gear: finish[gear]))
+
+    return [gear.name for gear in reversed(path)], slack
+
+
+def _heat(fraction: float) -> str:
+    """Color between pale yellow and red for a fraction of the slowest gear."""
+    green = int(255 - 200 * fraction)
+    blue = int(200 - 200 * fraction)
+    return f"#ff{green:02x}{blue:02x}"
+
 
 class NetworkPlot:
     """Network plotting utility."""
 
-    def __init__(self, graph: networkx.DiGraph) -> None:
+    def __init__(
+        self,
+        graph: networkx.DiGraph,
+        timings: Optional[Dict[str, Tuple[float, float]]] = None,
+    ) -> None:
         """Network plot constructor."""
         import pydot
 
         self._graph: networkx.DiGraph = graph
+        self._timings: Dict[str, Tuple[float, float]] = timings or {}
+        self._critical_path: List[str] = []
+        self._slack: Dict[str, float] = {}
+
+        if self._timings:
+            self._critical_path, self._slack = critical_path(graph, self._timings)
+
+        critical = set(self._critical_path)
+        slowest = max(self.elapsed.values(), default=0.0) or 1.0
 
         g = pydot.Dot(graph_type="digraph", rank="same")
 
         for nx_node in self._graph.nodes:
+            attrs = {}
+            label = str(nx_node)
+
+            # NOTE: Graphs of runs carry data node values, nodes do not hold them.
+            if "value" in self._graph.nodes[nx_node]:
+                label = nx_node.label(self._graph.nodes[nx_node]["value"])
+
+            if isinstance(nx_node, Gear) and nx_node.name in self.elapsed:
+                elapsed = self.elapsed[nx_node.name]
+                label = f"{label}\\n{elapsed * 1e3:.1f} ms"
+                attrs.update(style="filled", fillcolor=_heat(elapsed / slowest))
+                if nx_node.name in critical:
+                    attrs.update(color="red", penwidth="3")
+                else:
+                    label = f"{label}\\nslack {self._slack[nx_node.name] * 1e3:.1f} ms"
+
             node = pydot.Node(
-                name=nx_node.name_uniq, label=str(nx_node), shape=nx_node.shape
+                name=nx_node.name_uniq, label=label, shape=nx_node.shape, **attrs
             )
             g.add_node(node)
 
         for src, dst, param in self._graph.edges(data=True):
-            edge = pydot.Edge(src=src.name_uniq, dst=dst.name_uniq)
+            attrs = {}
+            if self._on_critical_path(src, dst):
+                attrs.update(color="red", penwidth="3")
+
+            edge = pydot.Edge(src=src.name_uniq, dst=dst.name_uniq, **attrs)
             g.add_edge(edge)
 
         self._pydot_graph = g
 
+    def _on_critical_path(self, src, dst) -> bool:
+        """Check if an edge links consecutive gears of the critical path."""
+        path = self._critical_path
+        if isinstance(src, Gear):
+            idx = path.index(src.name) if src.name in path else -1
+            return 0 <= idx < len(path) - 1 and any(
+                consumer.name == path[idx + 1]
+                for consumer in self._graph.successors(dst)
+            )
+
+        if isinstance(dst, Gear) and dst.name in path[1:]:
+            previous = path[path.index(dst.name) - 1]
+            return any(
+                producer.name == previous for producer in self._graph.predecessors(src)
+            )
+
+        return False
+
+    @property
+    def elapsed(self) -> Dict[str, float]:
+        """Elapsed time of every timed gear in seconds."""
+        return {name: end - start for name, (start, end) in self._timings.items()}
+
+    @property
+    def critical_path(self) -> List[str]:
+        """Names of gears on the critical path of the run."""
+        return self._critical_path
+
+    @property
+    def slack(self) -> Dict[str, float]:
+        """Seconds each gear could be delayed without delaying the run."""
+        return self._slack
+
     @property
     def meta(self):
         """Return metadata of network plot."""
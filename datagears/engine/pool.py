@@ -0,0 +1,91 @@
+import atexit
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from typing import Optional, Set
+
+
+def _worker_pid(delay: float = 0.0) -> int:
+    """Report worker process id, optionally keeping the worker busy."""
+    if delay:
+        time.sleep(delay)
+
+    return os.getpid()
+
+
+class WorkerPool:
+    """Long-lived pool of worker processes shared across network runs."""
+
+    _default: Optional["WorkerPool"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, max_workers: int = 4) -> None:
+        """Worker pool constructor."""
+        if max_workers < 1:
+            raise ValueError("worker pool needs at least one worker")
+
+        self._max_workers: int = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "WorkerPool":
+        """Enter pool context."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Exit pool context and stop all workers."""
+        self.shutdown(wait=True)
+
+    def __repr__(self) -> str:
+        """String representation of a pool."""
+        state = "running" if self.is_running else "stopped"
+        return f"WorkerPool(max_workers={self._max_workers}, {state})"
+
+    @classmethod
+    def default(cls) -> "WorkerPool":
+        """Returns the process-wide pool used when no pool is configured."""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+                atexit.register(cls._default.shutdown)
+
+            return cls._default
+
+    @property
+    def max_workers(self) -> int:
+        """Number of worker processes."""
+        return self._max_workers
+
+    @property
+    def is_running(self) -> bool:
+        """Check if worker processes were started."""
+        return self._executor is not None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """Returns the underlying executor, starting it on first use."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self._max_workers)
+
+            return self._executor
+
+    def warmup(self, timeout: Optional[float] = None) -> Set[int]:
+        """Start all worker processes ahead of the first run."""
+        # NOTE: Busy tasks force the executor to spawn every worker instead of
+        # reusing the first idle one.
+        futures = [
+            self.executor.submit(_worker_pid, 0.05) for _ in range(self._max_workers)
+        ]
+        wait(futures, timeout=timeout)
+
+        return {future.result() for future in futures if future.done()}
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop worker processes, the pool restarts on next use."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+
+        if executor is not None:
+            executor.shutdown(wait=wait)
@@ -0,0 +1,160 @@
+import json
+import threading
+from typing import Any, Dict, List, Optional
+
+from datagears.engine.api import NetworkAPI
+from datagears.engine.worker import FunctionRef, function_ref
+
+NETWORKS_KEY = "datagears:networks"
+
+
+class InMemoryRedis:
+    """In-process stand-in for the Redis hash commands used by the registry."""
+
+    def __init__(self) -> None:
+        """In-memory store constructor."""
+        self._hashes: Dict[str, Dict[bytes, bytes]] = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        """String representation of a store."""
+        return "InMemoryRedis()"
+
+    @staticmethod
+    def _bytes(value: Any) -> bytes:
+        """Encode keys and values the way Redis returns them."""
+        return value if isinstance(value, bytes) else str(value).encode()
+
+    def hset(self, name: str, key: Any, value: Any) -> int:
+        """Set a field of a hash."""
+        with self._lock:
+            fields = self._hashes.setdefault(name, {})
+            created = self._bytes(key) not in fields
+            fields[self._bytes(key)] = self._bytes(value)
+
+        return int(created)
+
+    def hget(self, name: str, key: Any) -> Optional[bytes]:
+        """Get a field of a hash."""
+        with self._lock:
+            return self._hashes.get(name, {}).get(self._bytes(key))
+
+    def hgetall(self, name: str) -> Dict[bytes, bytes]:
+        """Get all fields of a hash."""
+        with self._lock:
+            return dict(self._hashes.get(name, {}))
+
+    def hdel(self, name: str, *keys: Any) -> int:
+        """Delete fields of a hash."""
+        with self._lock:
+            fields = self._hashes.get(name, {})
+            return sum(fields.pop(self._bytes(key), None) is not None for key in keys)
+
+
+class NetworkRegistry:
+    """Networks registered under their name in a Redis hash."""
+
+    def __init__(self, client: Any = None, key: str = NETWORKS_KEY) -> None:
+        """Network registry constructor."""
+        self._client = client if client is not None else InMemoryRedis()
+        self._key: str = key
+
+    def __repr__(self) -> str:
+        """String representation of a registry."""
+        return f"NetworkRegistry({self._client!r})"
+
+    @property
+    def client(self) -> Any:
+        """Redis client of the registry."""
+        return self._client
+
+    @staticmethod
+    def dumps(network: NetworkAPI) -> bytes:
+        """Serialize a network as references to its output gear functions."""
+        outputs = []
+        for func in network._outputting_nodes:
+            ref = function_ref(func)
+            if not isinstance(ref, FunctionRef):
+                raise ValueError(
+                    f"gear `{func.__name__}` can not be imported by name and can not"
+                    " be registered"
+                )
+            outputs.append(list(ref))
+
+        return json.dumps({"name": network.core.name, "outputs": outputs}).encode()
+
+    @staticmethod
+    def loads(payload: bytes) -> NetworkAPI:
+        """Rebuild a network, importing its gear functions."""
+        from datagears.engine.network import Network
+
+        spec = json.loads(payload)
+        outputs = [FunctionRef(*ref).resolve() for ref in spec["outputs"]]
+
+        return Network(spec["name"], outputs=outputs)
+
+    def register(self, network: NetworkAPI) -> str:
+        """Register a network, replacing a network of the same name."""
+        name = network.core.name
+        self._client.hset(self._key, name, self.dumps(network))
+
+        return name
+
+    def unregister(self, name: str) -> bool:
+        """Remove a registered network."""
+        return bool(self._client.hdel(self._key, name))
+
+    @property
+    def names(self) -> List[str]:
+        """Names of registered networks."""
+        return sorted(name.decode() for name in self._client.hgetall(self._key))
+
+    def get(self, name: str) -> NetworkAPI:
+        """Returns a registered network."""
+        payload = self._client.hget(self._key, name)
+        if payload is None:
+            raise KeyError(f"network `{name}` is not registered")
+
+        return self.loads(payload)
+
+    def networks(self) -> List[NetworkAPI]:
+        """Returns all registered networks."""
+        registered = self._client.hgetall(self._key)
+        return [self.loads(registered[name]) for name in sorted(registered)]
+
+
+_registry: Optional[NetworkRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def init(config: Optional[dict] = None) -> NetworkRegistry:
+    """Connect the process-wide registry to Redis or an in-process store."""
+    global _registry
+
+    config = config or {}
+    client = config.get("client")
+    if client is None and config.get("redis_uri"):
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("connecting to `redis_uri` requires the `redis` package")
+
+        client = redis.Redis.from_url(config["redis_uri"])
+
+    with _registry_lock:
+        _registry = NetworkRegistry(client, key=config.get("key", NETWORKS_KEY))
+        return _registry
+
+
+def get_registry() -> NetworkRegistry:
+    """Returns the process-wide registry, an in-process one unless configured."""
+    with _registry_lock:
+        if _registry is not None:
+            return _registry
+
+    return init()
+
+
+def get_networks() -> List[NetworkAPI]:
+    """Returns all networks of the process-wide registry."""
+    return get_registry().networks()
@@ -0,0 +1,218 @@
+import asyncio
+import hashlib
+import pickle
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from queue import Empty, SimpleQueue
+from typing import Any, Dict, List, Optional, Tuple
+
+from datagears.engine.api import NetworkAPI
+
+# NOTE: Queued request, inputs with the coalescing key and the shared future.
+_Request = Tuple[dict, Optional[str], Future]
+
+
+def _fingerprint(inputs: dict) -> Optional[str]:
+    """Key of identical inputs, `None` when inputs can not be hashed."""
+    try:
+        payload = pickle.dumps(sorted(inputs.items()), protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return None
+
+    return hashlib.sha256(payload).hexdigest()
+
+
+def _settle(future: Future, result: Any = None, error: Optional[Exception] = None):
+    """Resolve a future unless it was cancelled or resolved already."""
+    if future.done() or not future.set_running_or_notify_cancel():
+        return
+
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+def _follow(shared: Future) -> Future:
+    """Future of a single caller resolved with a shared future."""
+    future: Future = Future()
+
+    def copy(shared: Future) -> None:
+        error = shared.exception()
+        if error is not None:
+            return _settle(future, error=error)
+
+        # NOTE: Every caller gets its own result dict, values themselves are shared.
+        result = shared.result()
+        _settle(future, dict(result) if isinstance(result, dict) else result)
+
+    shared.add_done_callback(copy)
+    return future
+
+
+class NetworkServer:
+    """Serving front-end coalescing identical runs and batching concurrent ones."""
+
+    def __init__(
+        self,
+        network: NetworkAPI,
+        max_batch_size: int = 32,
+        max_wait: float = 0.005,
+        max_concurrency: int = 4,
+        coalesce: bool = True,
+        config: Optional[dict] = None,
+    ) -> None:
+        """Network server constructor."""
+        if max_batch_size < 1:
+            raise ValueError("batches need room for at least one request")
+
+        self._network = network
+        self._max_batch_size: int = max_batch_size
+        self._max_wait: float = max_wait
+        self._coalesce: bool = coalesce
+        # NOTE: Served runs are never updated, their intermediates are freed early.
+        self._config: dict = {"release": True, **(config or {})}
+
+        self._queue: SimpleQueue = SimpleQueue()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="datagears-serving"
+        )
+        self._dispatcher = threading.Thread(
+            target=self._dispatch, name="datagears-dispatcher", daemon=True
+        )
+        self.requests: int = 0
+        self.coalesced: int = 0
+        self.batches: int = 0
+
+        self._dispatcher.start()
+
+    def __enter__(self) -> "NetworkServer":
+        """Enter server context."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Exit server context, finishing queued requests."""
+        self.close()
+
+    def __repr__(self) -> str:
+        """String representation of a server."""
+        return (
+            f"NetworkServer({self._network.core.name}, "
+            f"max_batch_size={self._max_batch_size}, max_wait={self._max_wait})"
+        )
+
+    def submit(self, **inputs) -> Future:
+        """Queue a run, returns a future of its result."""
+        if self._closed.is_set():
+            raise RuntimeError("network server is closed")
+
+        key = _fingerprint(inputs) if self._coalesce else None
+        with self._lock:
+            self.requests += 1
+            if key is not None and key in self._inflight:
+                self.coalesced += 1
+                return _follow(self._inflight[key])
+
+            # NOTE: Callers get their own futures, one of them cancelling its
+            # future leaves the shared run and the other callers alone.
+            future: Future = Future()
+            if key is not None:
+                self._inflight[key] = future
+
+        self._queue.put((inputs, key, future))
+        return _follow(future)
+
+    def run(self, **inputs) -> dict:
+        """Run the network, waiting for the result."""
+        return self.submit(**inputs).result()
+
+    async def arun(self, **inputs) -> dict:
+        """Run the network without blocking the running event loop."""
+        return await asyncio.wrap_future(self.submit(**inputs))
+
+    def _dispatch(self) -> None:
+        """Gather queued requests into batches."""
+        while True:
+            request = self._queue.get()
+            if request is None:
+                return
+
+            batch = [request]
+            deadline = time.monotonic() + self._max_wait
+            while len(batch) < self._max_batch_size:
+                try:
+                    request = self._queue.get(
+                        timeout=max(deadline - time.monotonic(), 0)
+                    )
+                except Empty:
+                    break
+
+                if request is None:
+                    self._executor.submit(self._execute, batch)
+                    return
+                batch.append(request)
+
+            self._executor.submit(self._execute, batch)
+
+    def _execute(self, batch: List[_Request]) -> None:
+        """Run a batch of requests and resolve their futures."""
+        with self._lock:
+            self.batches += 1
+
+        if len(batch) == 1:
+            inputs, key, future = batch[0]
+            try:
+                result = self._network.run(config=self._config, **inputs).result
+            except Exception as e:
+                self._forget(key)
+                return _settle(future, error=e)
+
+            return self._resolve(batch[0], result)
+
+        try:
+            results = self._run_batch([inputs for inputs, _, _ in batch])
+        except Exception:
+            # NOTE: A failing batch is retried request by request so a single bad
+            # input fails only its own callers.
+            for request in batch:
+                self._execute([request])
+            return
+
+        for request, result in zip(batch, results):
+            self._resolve(request, result)
+
+    def _run_batch(self, rows: List[dict]) -> List[dict]:
+        """Run rows of inputs as a single batched execution."""
+        columns = {name: [row[name] for row in rows] for name in rows[0]}
+        result = self._network.run_batch(columns, config=self._config).result
+
+        return [
+            {name: column[row] for name, column in result.items()}
+            for row in range(len(rows))
+        ]
+
+    def _resolve(self, request: _Request, result: Any) -> None:
+        """Resolve a request with its result."""
+        _, key, future = request
+        self._forget(key)
+        _settle(future, result)
+
+    def _forget(self, key: Optional[str]) -> None:
+        """Stop coalescing new requests into a finished run."""
+        if key is not None:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def close(self) -> None:
+        """Finish queued requests and stop the server."""
+        if self._closed.is_set():
+            return
+
+        self._closed.set()
+        self._queue.put(None)
+        self._dispatcher.join()
+        self._executor.shutdown(wait=True)
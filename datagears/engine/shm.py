@@ -0,0 +1,234 @@
+import sys
+import threading
+from concurrent.futures import Future
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import (Any, Callable, Dict, Iterable, List, NamedTuple, Optional,
+                    Tuple, Union)
+
+from datagears.engine.worker import FunctionRef, execute
+
+DEFAULT_THRESHOLD = 1 << 20
+
+
+class SharedHandle(NamedTuple):
+    """Reference to a value placed in a shared memory segment."""
+
+    name: str
+    nbytes: int
+    dtype: Optional[str] = None
+    shape: Tuple[int, ...] = ()
+
+    @property
+    def is_array(self) -> bool:
+        """Check if the segment holds a NumPy array."""
+        return self.dtype is not None
+
+
+def _numpy():
+    """Returns NumPy when the process already uses it."""
+    return sys.modules.get("numpy")
+
+
+def _open(name: str) -> SharedMemory:
+    """Attach to an existing segment without taking over its cleanup."""
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+
+    # NOTE: Before Python 3.13 attaching registers the segment with the resource
+    # tracker, which would unlink it once this process exits.
+    segment = SharedMemory(name=name)
+    resource_tracker.unregister(segment._name, "shared_memory")
+    return segment
+
+
+def share(value: Any, threshold: int) -> Any:
+    """Move a large buffer into a new shared memory segment."""
+    np = _numpy()
+    if np is not None and isinstance(value, np.ndarray):
+        if value.dtype.hasobject or value.nbytes < threshold:
+            return value
+
+        segment = SharedMemory(create=True, size=max(value.nbytes, 1))
+        np.ndarray(value.shape, dtype=value.dtype, buffer=segment.buf)[...] = value
+        handle = SharedHandle(segment.name, value.nbytes, value.dtype.str, value.shape)
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        view = memoryview(value).cast("B")
+        if view.nbytes < threshold:
+            return value
+
+        segment = SharedMemory(create=True, size=max(view.nbytes, 1))
+        segment.buf[: view.nbytes] = view
+        handle = SharedHandle(segment.name, view.nbytes)
+    else:
+        return value
+
+    # NOTE: The engine owns the segment from now on and unlinks it once all
+    # consumers are done.
+    resource_tracker.unregister(segment._name, "shared_memory")
+    segment.close()
+    return handle
+
+
+def view(segment: SharedMemory, handle: SharedHandle) -> Any:
+    """Zero-copy, read-only view of a shared value."""
+    if handle.is_array:
+        np = _numpy() or __import__("numpy")
+        array = np.ndarray(
+            handle.shape, dtype=np.dtype(handle.dtype), buffer=segment.buf
+        )
+        array.flags.writeable = False
+        return array
+
+    return segment.buf[: handle.nbytes].toreadonly()
+
+
+# NOTE: Segments still referenced by objects which outlived their gear call.
+_LINGERING: List[SharedMemory] = []
+
+
+def _close(segments: List[SharedMemory]) -> None:
+    """Close segments, keeping those with exported views for a later attempt."""
+    for segment in segments:
+        try:
+            segment.close()
+        except BufferError:
+            _LINGERING.append(segment)
+
+
+def execute_shared(
+    target: Union[FunctionRef, Callable], kwargs: dict, threshold: int
+) -> Any:
+    """Execute a gear reading shared inputs and sharing its large result."""
+    _close([_LINGERING.pop() for _ in range(len(_LINGERING))])
+
+    segments = []
+    resolved = {}
+    for name, value in kwargs.items():
+        if isinstance(value, SharedHandle):
+            segment = _open(value.name)
+            segments.append(segment)
+            value = view(segment, value)
+        resolved[name] = value
+
+    try:
+        return share(execute(target, resolved), threshold)
+    finally:
+        resolved.clear()
+        _close(segments)
+
+
+EXECUTE_SHARED = FunctionRef(__name__, execute_shared.__qualname__)
+
+
+class SharedMemoryTransport:
+    """Engine side bookkeeping of shared memory segments of a run."""
+
+    def __init__(self, threshold: int = DEFAULT_THRESHOLD) -> None:
+        """Shared memory transport constructor."""
+        self.threshold: int = threshold
+        self._segments: Dict[str, SharedMemory] = {}
+        self._live: Dict[str, SharedHandle] = {}
+        self._lock = threading.Lock()
+
+        # NOTE: Workers forked from now on share the tracker of this process.
+        resource_tracker.ensure_running()
+
+    def __repr__(self) -> str:
+        """String representation of a transport."""
+        return f"SharedMemoryTransport(threshold={self.threshold})"
+
+    def call(self, target, kwargs: dict) -> Tuple[FunctionRef, dict]:
+        """Wrap a gear call for execution in a worker process."""
+        return EXECUTE_SHARED, {
+            "target": target,
+            "kwargs": kwargs,
+            "threshold": self.threshold,
+        }
+
+    def _segment(self, handle: SharedHandle) -> SharedMemory:
+        """Open a segment in this process."""
+        with self._lock:
+            segment = self._segments.get(handle.name)
+            if segment is None:
+                # NOTE: Opening registers the segment with our resource tracker so
+                # it is cleaned up even if the engine dies before releasing it.
+                segment = self._segments[handle.name] = SharedMemory(name=handle.name)
+
+            return segment
+
+    def track(self, value: Any) -> None:
+        """Remember a handle produced by a worker until it is released."""
+        if isinstance(value, SharedHandle):
+            with self._lock:
+                self._live[value.name] = value
+
+    @staticmethod
+    def is_shared(value: Any) -> bool:
+        """Check if a value is a handle to a shared segment."""
+        return isinstance(value, SharedHandle)
+
+    @property
+    def live(self) -> int:
+        """Number of segments which were not released yet."""
+        return len(self._live)
+
+    def resolve(self, kwargs: dict) -> dict:
+        """Replace handles by zero-copy views for gears running in this process."""
+        return {
+            name: (
+                view(self._segment(value), value)
+                if isinstance(value, SharedHandle)
+                else value
+            )
+            for name, value in kwargs.items()
+        }
+
+    def materialize(self, value: Any) -> Any:
+        """Copy a shared value into this process."""
+        if not isinstance(value, SharedHandle):
+            return value
+
+        shared = view(self._segment(value), value)
+        return shared.copy() if value.is_array else bytes(shared)
+
+    def release(self, value: Any) -> None:
+        """Free the segment behind a handle."""
+        if not isinstance(value, SharedHandle):
+            return
+
+        segment = self._segment(value)
+        with self._lock:
+            self._segments.pop(value.name, None)
+            self._live.pop(value.name, None)
+
+        segment.unlink()
+        _close([segment])
+
+    def release_later(self, futures: Iterable[Future]) -> None:
+        """Free segments of calls which are still running when a run fails."""
+        for future in futures:
+            future.add_done_callback(self._release_result)
+
+    def _release_result(self, future: Future) -> None:
+        """Free the segment of a finished call, if it produced one."""
+        if future.cancelled() or future.exception() is not None:
+            return
+
+        try:
+            self.release(future.result())
+        except FileNotFoundError:
+            pass
+
+    def release_all(self) -> None:
+        """Free every segment of the run which was not released yet."""
+        for handle in list(self._live.values()):
+            try:
+                self.release(handle)
+            except FileNotFoundError:
+                pass
+
+        with self._lock:
+            segments, self._segments = list(self._segments.values()), {}
+
+        _close(segments)
@@ -0,0 +1,237 @@
+import threading
+from collections.abc import Iterator as IteratorABC
+from queue import Empty, Full, Queue
+from typing import Any, Dict, Iterator, List, Union
+
+from datagears.engine.api import EngineAPI, NetworkAPI
+from datagears.engine.backends import Backend, InlineBackend, get_backend
+from datagears.engine.worker import execute
+
+# NOTE: Markers sent through channels, every channel starts with a header which
+# is either a constant value or the start of a stream terminated by `_END`.
+_STREAM = object()
+_END = object()
+
+
+class _Constant:
+    """Header of a channel carrying a single value."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any) -> None:
+        """Constant header constructor."""
+        self.value = value
+
+
+class _Failure:
+    """Exception raised by an upstream stage."""
+
+    __slots__ = ("exception",)
+
+    def __init__(self, exception: BaseException) -> None:
+        """Failure marker constructor."""
+        self.exception = exception
+
+
+class _Stopped(Exception):
+    """Raised inside stages once the pipeline is shut down."""
+
+
+class _Channel:
+    """Bounded queue between two pipeline stages."""
+
+    def __init__(self, size: int, stop: threading.Event) -> None:
+        """Channel constructor."""
+        self._queue: Queue = Queue(maxsize=size)
+        self._stop = stop
+
+    def put(self, item: Any) -> None:
+        """Put an item, blocking while the consumer is behind."""
+        while True:
+            try:
+                return self._queue.put(item, timeout=0.1)
+            except Full:
+                if self._stop.is_set():
+                    raise _Stopped
+
+    def get(self) -> Any:
+        """Get an item, blocking until the producer sends one."""
+        while True:
+            try:
+                return self._queue.get(timeout=0.1)
+            except Empty:
+                if self._stop.is_set():
+                    raise _Stopped
+
+
+class StreamEngine(EngineAPI):
+    """Pipelined engine streaming values of yielding gears through the network."""
+
+    def __init__(
+        self,
+        compute: NetworkAPI,
+        buffer_size: int = 16,
+        backend: Union[str, Backend, None] = None,
+    ) -> None:
+        """Stream engine constructor."""
+        from datagears.engine.network import Gear, Network
+
+        if isinstance(compute, Gear):
+            compute = Network(compute.name, outputs=[compute])
+
+        if buffer_size < 1:
+            raise ValueError("stream buffers need room for at least one item")
+
+        self._network: Network = compute
+        self._plan = self._network.compile()
+        self._buffer_size: int = buffer_size
+        self._backend: Backend = (
+            get_backend(backend) if backend is not None else InlineBackend()
+        )
+
+    def prepare(self) -> None:
+        """Prepare the given computation for executor."""
+        pass
+
+    def _call(self, gear_id: int, kwargs: dict) -> Any:
+        """Call a gear for a single element of its input streams."""
+        if isinstance(self._backend, InlineBackend):
+            return execute(self._plan.refs[gear_id], kwargs)
+
+        return self._backend.submit(self._plan.refs[gear_id], kwargs).result()
+
+    def _stage(self, gear_id: int, inputs: dict, outputs: List[_Channel]) -> None:
+        """Pipeline stage running a single gear."""
+
+        def publish(item: Any) -> None:
+            for channel in outputs:
+                channel.put(item)
+
+        try:
+            constants: Dict[str, Any] = {}
+            streams: Dict[str, _Channel] = {}
+            for name, source in inputs.items():
+                if not isinstance(source, _Channel):
+                    constants[name] = source
+                    continue
+
+                header = source.get()
+                if isinstance(header, _Failure):
+                    return publish(header)
+                if header is _STREAM:
+                    streams[name] = source
+                else:
+                    constants[name] = header.value
+
+            if not streams:
+                value = execute(self._plan.refs[gear_id], constants)
+                if not isinstance(value, IteratorABC):
+                    return publish(_Constant(value))
+
+                publish(_STREAM)
+                for item in value:
+                    publish(item)
+                return publish(_END)
+
+            # NOTE: Gears consuming streams are applied element-wise, multiple input
+            # streams are consumed in lockstep.
+            publish(_STREAM)
+            while True:
+                row = dict(constants)
+                for name, channel in streams.items():
+                    item = channel.get()
+                    if item is _END or isinstance(item, _Failure):
+                        return publish(item)
+                    row[name] = item
+
+                publish(self._call(gear_id, row))
+        except _Stopped:
+            pass
+        except Exception as e:
+            try:
+                publish(_Failure(e))
+            except _Stopped:
+                pass
+
+    def run(self, output_all: bool = False, **kwargs) -> Iterator[dict]:
+        """Stream results of the network, one dict per element."""
+        state = self._plan.new_run()
+        state.set_input(kwargs)
+
+        return self._pipeline(state, output_all)
+
+    def _pipeline(self, state, output_all: bool) -> Iterator[dict]:
+        """Start pipeline stages and yield from the output channels."""
+        plan = self._plan
+        stop = threading.Event()
+        sinks = plan.gears if output_all else plan.output_gears
+        channels: Dict[int, List[_Channel]] = {gear_id: [] for gear_id in plan.gears}
+        stages = []
+
+        def connect(gear_id: int) -> _Channel:
+            channel = _Channel(self._buffer_size, stop)
+            channels[gear_id].append(channel)
+            return channel
+
+        for gear_id in plan.gears:
+            inputs = {
+                name: (
+                    connect(plan.producer[data_id])
+                    if data_id in plan.producer
+                    else state.values[data_id]
+                )
+                for name, data_id in plan.bindings[gear_id]
+            }
+            stages.append((gear_id, inputs))
+
+        outputs = {plan.gear(gear_id).name: connect(gear_id) for gear_id in sinks}
+
+        for gear_id, inputs in stages:
+            threading.Thread(
+                target=self._stage,
+                args=(gear_id, inputs, channels[gear_id]),
+                name=f"datagears-stream-{plan.gear(gear_id).name}",
+                daemon=True,
+            ).start()
+
+        try:
+            yield from self._collect(outputs)
+        finally:
+            stop.set()
+
+    @staticmethod
+    def _collect(outputs: Dict[str, _Channel]) -> Iterator[dict]:
+        """Zip output channels into result rows."""
+        constants: Dict[str, Any] = {}
+        streams: Dict[str, _Channel] = {}
+
+        for name, channel in outputs.items():
+            header = channel.get()
+            if isinstance(header, _Failure):
+                raise header.exception
+            if header is _STREAM:
+                streams[name] = channel
+            else:
+                constants[name] = header.value
+
+        if not streams:
+            yield constants
+            return
+
+        while True:
+            row = dict(constants)
+            for name, channel in streams.items():
+                item = channel.get()
+                if item is _END:
+                    return
+                if isinstance(item, _Failure):
+                    raise item.exception
+                row[name] = item
+
+            yield row
+
+    def register(self) -> str:
+        """Registers the computational network with RedisGears."""
+        from datagears.engine.registry import get_registry
+
+        return get_registry().register(self._network)
@@ -0,0 +1,189 @@
+import json
+import pickle
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass
+from typing import Iterator, List, Optional
+
+from datagears.engine.backends import Backend
+from datagears.engine.worker import EXECUTE_TRACED
+
+
+@dataclass
+class GearSpan:
+    """Timings of a single gear execution, wall clock seconds."""
+
+    gear: str
+    worker: str
+    pid: int
+    tid: int
+    submitted: float
+    started: float
+    finished: float
+    received: float
+    input_serialization: float = 0.0
+    output_serialization: float = 0.0
+    input_bytes: Optional[int] = None
+    output_bytes: Optional[int] = None
+
+    @property
+    def queue_wait(self) -> float:
+        """Time between submission and the start of execution."""
+        return max(0.0, self.started - self.submitted - self.input_serialization)
+
+    @property
+    def execution(self) -> float:
+        """Time spent in the gear function."""
+        return self.finished - self.started
+
+    @property
+    def transfer(self) -> float:
+        """Time between the end of execution and the result reaching the engine."""
+        return max(0.0, self.received - self.finished - self.output_serialization)
+
+    @property
+    def serialization(self) -> float:
+        """Time spent encoding and decoding inputs and results."""
+        return self.input_serialization + self.output_serialization
+
+    @property
+    def elapsed(self) -> float:
+        """Time between submission and receiving the result."""
+        return self.received - self.submitted
+
+
+class _TracingBackend(Backend):
+    """Backend proxy recording a span for every submitted call."""
+
+    def __init__(self, backend: Backend, trace: "RunTrace", gear: str) -> None:
+        """Tracing backend constructor."""
+        self.name = backend.name
+        self.remote = backend.remote
+        self._backend = backend
+        self._trace = trace
+        self._gear = gear
+
+    def submit(self, target, kwargs: dict) -> Future:
+        """Submit a traced call and resolve with the plain result."""
+        submitted = time.time()
+        encoded = 0.0
+        input_bytes = None
+
+        if self.remote:
+            payload = pickle.dumps(kwargs, protocol=pickle.HIGHEST_PROTOCOL)
+            encoded = time.time() - submitted
+            input_bytes = len(payload)
+            call = {"target": target, "payload": payload}
+        else:
+            call = {"target": target, "kwargs": kwargs}
+
+        traced = self._backend.submit(EXECUTE_TRACED, call)
+        future: Future = Future()
+
+        def done(traced: Future) -> None:
+            try:
+                result, meta = traced.result()
+                decode = time.time()
+                if self.remote:
+                    result = pickle.loads(result)
+                received = time.time()
+            except BaseException as e:
+                return future.set_exception(e)
+
+            self._trace.record(
+                GearSpan(
+                    gear=self._gear,
+                    worker=meta["worker"],
+                    pid=meta["pid"],
+                    tid=meta["tid"],
+                    submitted=submitted,
+                    started=meta["started"],
+                    finished=meta["finished"],
+                    received=received,
+                    input_serialization=encoded + meta["decode"],
+                    output_serialization=meta.get("encode", 0.0) + received - decode,
+                    input_bytes=input_bytes,
+                    output_bytes=meta.get("output_bytes"),
+                )
+            )
+            future.set_result(result)
+
+        traced.add_done_callback(done)
+        return future
+
+
+class RunTrace:
+    """Structured per-gear trace of a network run."""
+
+    def __init__(self, name: str) -> None:
+        """Run trace constructor."""
+        self.name: str = name
+        self._spans: List[GearSpan] = []
+        self._lock = threading.Lock()
+
+    def __iter__(self) -> Iterator[GearSpan]:
+        """Iterate over recorded spans."""
+        return iter(self.spans)
+
+    def __len__(self) -> int:
+        """Number of recorded spans."""
+        return len(self._spans)
+
+    def __repr__(self) -> str:
+        """String representation of a trace."""
+        return f"RunTrace({self.name}, spans={len(self)})"
+
+    @property
+    def spans(self) -> List[GearSpan]:
+        """Recorded spans ordered by submission."""
+        with self._lock:
+            return sorted(self._spans, key=lambda span: span.submitted)
+
+    def record(self, span: GearSpan) -> None:
+        """Add a span to the trace."""
+        with self._lock:
+            self._spans.append(span)
+
+    def wrap(self, backend: Backend, gear: str) -> Backend:
+        """Returns a backend which records spans of the given gear."""
+        return _TracingBackend(backend, self, gear)
+
+    def to_list(self) -> List[dict]:
+        """Returns spans as plain dictionaries."""
+        return [asdict(span) for span in self.spans]
+
+    def to_chrome_trace(self) -> dict:
+        """Export spans in the Chrome trace-event format."""
+        events = []
+        for span in self.spans:
+            args = {
+                "queue_wait_ms": span.queue_wait * 1e3,
+                "serialization_ms": span.serialization * 1e3,
+                "transfer_ms": span.transfer * 1e3,
+                "input_bytes": span.input_bytes,
+                "output_bytes": span.output_bytes,
+            }
+            events.append(
+                {
+                    "name": span.gear,
+                    "cat": "gear",
+                    "ph": "X",
+                    "ts": span.started * 1e6,
+                    "dur": span.execution * 1e6,
+                    "pid": span.pid,
+                    "tid": span.tid,
+                    "args": args,
+                }
+            )
+
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"network": self.name},
+        }
+
+    def dump(self, filename: str) -> None:
+        """Write Chrome trace-event JSON to a file."""
+        with open(filename, "w") as f:
+            json.dump(self.to_chrome_trace(), f)
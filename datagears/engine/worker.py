@@ -0,0 +1,207 @@
+import asyncio
+import importlib
+import inspect
+import os
+import pickle
+import sys
+import threading
+import time
+from typing import (Any, Callable, Dict, Iterable, NamedTuple, Optional, Tuple,
+                    Union)
+
+from datagears.engine.nodes import GearException
+
+
+class FunctionRef(NamedTuple):
+    """Importable reference to a gear function."""
+
+    module: str
+    qualname: str
+
+    @property
+    def name(self) -> str:
+        """Function name."""
+        return self.qualname.rsplit(".", 1)[-1]
+
+    def resolve(self) -> Callable:
+        """Import the referenced function."""
+        target: Any = importlib.import_module(self.module)
+        for attr in self.qualname.split("."):
+            target = getattr(target, attr)
+
+        return target
+
+
+class ObjectRef(NamedTuple):
+    """Reference to a result kept in the object store of a worker."""
+
+    worker: int
+    key: int
+    nbytes: int = 0
+
+
+# NOTE: Functions resolved by this process, filled once per worker on first use.
+_FUNCTIONS: Dict[FunctionRef, Callable] = {}
+
+# NOTE: Results kept by this worker process, keyed by object store key.
+_OBJECTS: Dict[int, Any] = {}
+
+
+def function_ref(func: Callable) -> Union[FunctionRef, Callable]:
+    """Reference a function by name when workers are able to import it."""
+    module = getattr(func, "__module__", None)
+    qualname = getattr(func, "__qualname__", "")
+
+    if not module or "<" in qualname or module not in sys.modules:
+        return func
+
+    ref = FunctionRef(module, qualname)
+    try:
+        if ref.resolve() is not func:
+            return func
+    except AttributeError:
+        return func
+
+    return ref
+
+
+def resolve(target: Union[FunctionRef, Callable]) -> Callable:
+    """Resolve a function reference from the worker registry."""
+    if not isinstance(target, FunctionRef):
+        return target
+
+    func = _FUNCTIONS.get(target)
+    if func is None:
+        func = _FUNCTIONS[target] = target.resolve()
+
+    return func
+
+
+def execute(target: Union[FunctionRef, Callable], kwargs: dict) -> Any:
+    """Execute a gear function with its resolved arguments."""
+    func = resolve(target)
+
+    try:
+        result = func(**kwargs)
+        if inspect.iscoroutine(result):
+            result = asyncio.run(result)
+    except GearException:
+        raise
+    except Exception as e:
+        raise GearException(gear=func.__name__, params=kwargs, raised_exception=e)
+
+    return result
+
+
+async def execute_async(target: Union[FunctionRef, Callable], kwargs: dict) -> Any:
+    """Execute a gear function on the running event loop."""
+    func = resolve(target)
+
+    try:
+        result = func(**kwargs)
+        if inspect.isawaitable(result):
+            result = await result
+    except GearException:
+        raise
+    except Exception as e:
+        raise GearException(gear=func.__name__, params=kwargs, raised_exception=e)
+
+    return result
+
+
+def map_rows(target: Union[FunctionRef, Callable], columns: dict, size: int) -> list:
+    """Execute a gear function once per row of a chunk of input columns."""
+    return [
+        execute(target, {name: column[row] for name, column in columns.items()})
+        for row in range(size)
+    ]
+
+
+MAP_ROWS = FunctionRef(__name__, map_rows.__qualname__)
+
+
+def execute_chain(steps: list) -> Any:
+    """Execute a fused chain of gears, passing each result to the next gear."""
+    result = None
+    for target, kwargs, params in steps:
+        if params:
+            kwargs = {**kwargs, **{param: result for param in params}}
+        result = execute(target, kwargs)
+
+    return result
+
+
+EXECUTE_CHAIN = FunctionRef(__name__, execute_chain.__qualname__)
+
+
+def execute_traced(
+    target: Union[FunctionRef, Callable],
+    kwargs: Optional[dict] = None,
+    payload: Optional[bytes] = None,
+) -> Tuple[Any, dict]:
+    """Execute a gear function and measure where its time is spent."""
+    started = time.time()
+    if payload is not None:
+        kwargs = pickle.loads(payload)
+
+    called = time.time()
+    result = execute(target, kwargs)
+    finished = time.time()
+
+    meta = {
+        "pid": os.getpid(),
+        "tid": threading.get_ident(),
+        "worker": f"{os.getpid()}/{threading.current_thread().name}",
+        "started": called,
+        "finished": finished,
+        "decode": called - started,
+    }
+
+    # NOTE: Results of remote calls are encoded here so the encoding cost and
+    # payload size are attributed to the worker.
+    if payload is not None:
+        result = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        meta["encode"] = time.time() - finished
+        meta["output_bytes"] = len(result)
+
+    return result, meta
+
+
+EXECUTE_TRACED = FunctionRef(__name__, execute_traced.__qualname__)
+
+
+def sizeof(value: Any) -> int:
+    """Approximate memory held by a value."""
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(sys.getsizeof(item) for item in value)
+    elif isinstance(value, dict):
+        size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in value.items())
+
+    return size
+
+
+def execute_stored(target: Union[FunctionRef, Callable], kwargs: dict, key: int) -> int:
+    """Execute a gear function reading and keeping values in the object store."""
+    kwargs = {
+        name: _OBJECTS[value.key] if isinstance(value, ObjectRef) else value
+        for name, value in kwargs.items()
+    }
+    result = _OBJECTS[key] = execute(target, kwargs)
+
+    return sizeof(result)
+
+
+def fetch_object(key: int) -> Any:
+    """Returns a value of the object store."""
+    return _OBJECTS[key]
+
+
+def drop_objects(keys: Iterable[int]) -> None:
+    """Remove values from the object store."""
+    for key in keys:
+        _OBJECTS.pop(key, None)
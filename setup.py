@@ -35,6 +35,10 @@ setup(
     package_dir={"datagears": "datagears"},
     include_package_data=True,
     install_requires=[],
+    extras_require={
+        "redis": ["redis>=4.2"],
+        "test": ["pytest", "fakeredis>=2.0"],
+    },
     license="MIT",
     zip_safe=False,
     keywords="datagears",
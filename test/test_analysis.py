@@ -1,7 +1,10 @@
+import gc
 import inspect
 import types
 
-from datagears.engine.analysis import Signature
+import pytest
+
+from datagears.engine.analysis import Signature, _signatures, analyze, hints
 from datagears.engine.network import Depends
 
 from . import add, reduce
@@ -47,3 +50,41 @@ def test_depends_func_analysis():
     assert params["a"] == inspect.Parameter("a", 1)
     assert params["b"] == inspect.Parameter("b", 1, default=10)
     assert sig.output_type == int
+
+
+def test_signature_cache():
+    """Test signature analysis is cached per function."""
+    assert analyze(reduce) is analyze(reduce)
+    assert Signature(reduce).params is Signature(reduce).params
+
+    sig = Signature(reduce)
+    assert [(name, func) for name, func in sig.dependencies] == [("sum", add)]
+    assert [param.name for param in sig.inputs] == ["c"]
+
+    def temporary(a: int, b: int = Depends(add)) -> int:
+        return a + b
+
+    assert Signature(temporary).hints == {}
+    hints(cache=False)(temporary)
+    assert Signature(temporary).hints == {"cache": False}
+    assert temporary in _signatures
+
+    size = len(_signatures)
+    del temporary
+    gc.collect()
+    assert len(_signatures) == size - 1
+
+    assert Signature(len).params.keys() == {"obj"}
+
+
+def test_signature_read_only():
+    """Test shared signatures can not be altered through a gear."""
+    sig = Signature(reduce)
+
+    with pytest.raises(TypeError):
+        sig.params["c"] = None
+    with pytest.raises(TypeError):
+        sig.hints["cache"] = False
+
+    assert Signature(reduce).hints == {}
+    assert set(Signature(reduce).params) == {"c", "sum"}
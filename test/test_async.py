@@ -0,0 +1,75 @@
+import asyncio
+import time
+
+from datagears.engine.network import Depends, Network
+
+from . import *
+
+loops = []
+
+
+async def wait(delay: float) -> float:
+    loops.append(asyncio.get_running_loop())
+    await asyncio.sleep(delay)
+    return delay
+
+
+def doubled(waited: float = Depends(wait)) -> float:
+    return waited * 2
+
+
+def test_arun():
+    """Test awaiting a network run gives the same result as running it."""
+    network = Network("my-network", outputs=[my_out])
+
+    run = asyncio.run(network.arun(config={"backend": "thread"}, a=1, b=2, c=3))
+
+    assert run.result == {"my_out": 0.0}
+    assert run.inputs == {"a": 1, "b": 2, "c": 3}
+    assert run.update(c=1) == {"my_out": 1.0}
+
+
+def test_arun_awaits_coroutine_gears():
+    """Test coroutine gears run on the caller's loop and runs are multiplexed."""
+    loops.clear()
+    network = Network("my-network", outputs=[doubled])
+
+    async def main():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.ensure_future(tick())
+        started = time.perf_counter()
+        runs = await asyncio.gather(
+            *(network.arun(config={"backend": "thread"}, delay=0.2) for _ in range(10))
+        )
+        elapsed = time.perf_counter() - started
+        ticker.cancel()
+
+        return runs, elapsed, ticks, asyncio.get_running_loop()
+
+    runs, elapsed, ticks, loop = asyncio.run(main())
+
+    assert [run.result for run in runs] == [{"doubled": 0.4}] * 10
+    assert elapsed < 1.0
+    assert ticks > 5
+    assert loops == [loop] * 10
+
+
+def postponed(deferred: int) -> int:
+    return deferred + 1
+
+
+def test_inputs_named_like_run_options():
+    """Test inputs named like options of a run are not taken for them."""
+    network = Network("my-network", outputs=[postponed])
+    config = {"backend": "inline"}
+
+    assert network.run(config=config, deferred=1).result == {"postponed": 2}
+    run = asyncio.run(network.arun(config=config, deferred=2))
+    assert run.result == {"postponed": 3}
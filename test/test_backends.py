@@ -0,0 +1,162 @@
+import asyncio
+import threading
+
+import pytest
+
+from datagears.engine.analysis import hints
+from datagears.engine.backends import (BACKENDS, AsyncioBackend, InlineBackend,
+                                       LocalityBackend, ThreadBackend,
+                                       get_backend)
+from datagears.engine.engine import LocalEngine
+from datagears.engine.network import Depends, Network
+
+from . import *
+
+calls = []
+
+
+def counted(a: int) -> int:
+    calls.append(a)
+    return a
+
+
+def left(x: int = Depends(counted)) -> int:
+    return x + 1
+
+
+def right(x: int = Depends(counted)) -> int:
+    return x + 2
+
+
+def both(lhs: int = Depends(left), rhs: int = Depends(right)) -> int:
+    return lhs * rhs
+
+
+async def fetch(a: int) -> int:
+    await asyncio.sleep(0)
+    return a * 10
+
+
+@hints(backend="thread")
+def thread_name(x: int = Depends(fetch)) -> str:
+    return threading.current_thread().name
+
+
+@pytest.mark.parametrize("backend", sorted(BACKENDS))
+def test_backend_run(backend):
+    """Test network runs on every backend."""
+    network = Network("my-network", outputs=[my_out])
+    run = network.run(config={"backend": backend}, a=1, b=2, c=3)
+
+    assert run.result == {"my_out": 0.0}
+
+
+def test_inline_backend_computes_shared_gear_once():
+    """Test inline runs call shared dependencies once."""
+    calls.clear()
+    network = Network("my-network", outputs=[both])
+
+    run = network.run(config={"backend": InlineBackend()}, a=2)
+
+    assert run.result == {"both": 12}
+    assert calls == [2]
+
+
+def test_async_gears():
+    """Test coroutine gears are awaited by every backend."""
+    network = Network("my-network", outputs=[fetch])
+
+    with AsyncioBackend() as backend:
+        assert network.run(config={"backend": backend}, a=2).result == {"fetch": 20}
+
+    assert network.run(config={"backend": "inline"}, a=3).result == {"fetch": 30}
+
+
+def test_asyncio_backend_shutdown_no_wait():
+    """Test the event loop is closed by its own thread without waiting."""
+    backend = AsyncioBackend()
+    loop = backend.loop
+    thread = backend._thread
+
+    backend.shutdown(wait=False)
+    thread.join(timeout=5)
+    assert loop.is_closed()
+
+
+def test_per_gear_backend():
+    """Test gear hints select the backend of a single gear."""
+    network = Network("my-network", outputs=[thread_name])
+    engine = LocalEngine(network, backend="inline")
+
+    assert engine.run(a=1)["thread_name"].startswith("datagears")
+    assert isinstance(engine._backend_for(0), InlineBackend)
+    assert get_backend("thread") is get_backend("thread")
+    assert isinstance(get_backend("thread"), ThreadBackend)
+
+
+def test_locality_backend_chain():
+    """Test chained gears run next to their inputs without transfers."""
+    network = Network("my-network", outputs=[my_out])
+
+    with LocalityBackend(max_workers=2) as backend:
+        engine = LocalEngine(network, backend=backend)
+
+        assert engine.run(a=1, b=2, c=3) == {"my_out": 0.0}
+        assert engine.run(output_all=True, a=5, b=2, c=3) == {
+            "add": 7,
+            "add_one": 1,
+            "reduce": 4,
+            "my_out": 2.0,
+        }
+        assert engine.update(output_all=True, c=1)["my_out"] == 3.0
+
+
+def stored_objects() -> int:
+    from datagears.engine.worker import _OBJECTS
+
+    return len(_OBJECTS)
+
+
+def test_locality_backend_frees_stores():
+    """Test runs leave no results in the object stores of workers."""
+    network = Network("my-network", outputs=[my_out])
+
+    with LocalityBackend(max_workers=2) as backend:
+        for release in (True, False):
+            for a in range(3):
+                run = network.run(
+                    config={"backend": backend, "release": release}, a=a, b=2, c=3
+                )
+                assert run.result == {"my_out": (a - 1) / 2}
+
+        assert run.update(c=1) == {"my_out": 1.5}
+        assert [
+            backend._worker(worker).submit(stored_objects).result()
+            for worker in range(2)
+        ] == [0, 0]
+
+
+def test_locality_backend_transfers():
+    """Test inputs held by other workers are moved only when needed."""
+    with LocalityBackend(max_workers=2) as backend:
+        summed = backend.submit_stored(add, {"a": 1, "b": 2})
+        single = backend.submit_stored(add_one, {})
+        summed, single = summed.result(), single.result()
+        assert summed.worker != single.worker
+
+        reduced = backend.submit_stored(reduce, {"c": 1, "sum": summed}).result()
+        assert reduced.worker == summed.worker
+        assert backend.transferred == 0
+
+        out = backend.submit_stored(my_out, {"reduced": reduced, "add_one": single})
+        assert backend.fetch(out.result()).result() == 1.0
+        assert backend.transferred == 1
+
+
+def test_unknown_backend():
+    """Test unknown backends and hints are rejected."""
+    with pytest.raises(ValueError):
+        get_backend("gpu")
+
+    with pytest.raises(ValueError):
+        hints(color="red")
@@ -0,0 +1,63 @@
+import pytest
+
+from datagears.engine.analysis import hints
+from datagears.engine.network import Depends, Network
+
+from . import *
+
+chunks = []
+
+
+@hints(vectorized=True)
+def scale(xs: list) -> list:
+    chunks.append(len(xs))
+    return [x * 10 for x in xs]
+
+
+def shift(scaled: int = Depends(scale), offset: int = 0) -> int:
+    return scaled + offset
+
+
+def test_run_batch():
+    """Test running a network over columns of rows."""
+    network = Network("my-network", outputs=[my_out])
+    inputs = {"a": [1, 2, 3], "b": [2, 2, 2], "c": [3, 2, 1]}
+
+    run = network.run_batch(inputs, chunk_size=2)
+    assert run.result == {"my_out": [0.0, 1.0, 2.0]}
+
+    run = network.run_batch(inputs, output_all=True, config={"backend": "thread"})
+    assert run.result["add"] == [3, 4, 5]
+    assert run.result["add_one"] == [1, 1, 1]
+
+
+def test_run_batch_vectorized():
+    """Test vectorized gears receive whole columns."""
+    chunks.clear()
+    network = Network("my-network", outputs=[shift])
+    inputs = {"xs": [1, 2, 3, 4, 5], "offset": [0, 1, 2, 3, 4]}
+
+    run = network.run_batch(inputs, chunk_size=2, config={"backend": "inline"})
+
+    assert run.result == {"shift": [10, 21, 32, 43, 54]}
+    assert chunks == [5]
+
+
+def test_run_batch_numpy():
+    """Test NumPy arrays are accepted as input columns."""
+    np = pytest.importorskip("numpy")
+    network = Network("my-network", outputs=[add])
+
+    run = network.run_batch({"a": np.arange(4), "b": np.ones(4)}, chunk_size=3)
+    assert run.result == {"add": [1.0, 2.0, 3.0, 4.0]}
+
+
+def test_run_batch_wrong_shape():
+    """Test batch inputs must be equally long columns."""
+    network = Network("my-network", outputs=[add])
+
+    with pytest.raises(ValueError):
+        network.run_batch({"a": [1, 2], "b": [1]})
+
+    with pytest.raises(ValueError):
+        network.run_batch({"a": [1, 2], "b": 1})
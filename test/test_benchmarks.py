@@ -0,0 +1,46 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from benchmarks.__main__ import compare, run_suite
+from benchmarks.graphs import SHAPES, generate
+from datagears.engine.network import Network
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+def test_generated_networks(shape):
+    """Test synthetic networks have the requested number of gears."""
+    outputs, inputs = generate(shape, 25)
+    network = Network(shape, outputs=outputs)
+
+    assert len(network.compile().gears) == 25
+    assert network.input_shape.keys() == inputs.keys()
+    assert network.run(config={"backend": "inline"}, **inputs).result
+
+
+def test_generated_gears_spawn():
+    """Test generated gears are importable by spawned worker processes."""
+    (last,), _ = generate("chain", 3)
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        assert executor.submit(last, x0=1).result() == 2
+
+
+def test_benchmark_suite():
+    """Test benchmark records are machine readable and comparable."""
+    records = run_suite([5], ["chain"], repeat=1, process_limit=5, duration=0.01)
+
+    benchmarks = {record["benchmark"] for record in records}
+    assert {
+        "construction",
+        "compile",
+        "schedule_inline",
+        "dispatch_process",
+    } <= benchmarks
+    assert all(record["seconds"] > 0 for record in records)
+
+    slower = [dict(record, seconds=record["seconds"] / 10) for record in records]
+    assert compare(records, records, tolerance=0.25) == []
+    assert len(compare(records, slower, tolerance=0.25)) == len(records)
@@ -0,0 +1,99 @@
+from datagears.engine.analysis import hints
+from datagears.engine.cache import GearCache
+from datagears.engine.network import Depends, Network
+
+from . import *
+
+calls = []
+
+
+def expensive(a: int) -> int:
+    calls.append(("expensive", a))
+    return a * 2
+
+
+@hints(cache=False)
+def volatile(x: int = Depends(expensive), b: int = 0) -> int:
+    calls.append(("volatile", x))
+    return x + b
+
+
+def make(n: int):
+    def scaled(a: int) -> int:
+        return a * n
+
+    return scaled
+
+
+def replaced(a: int) -> int:
+    return a
+
+
+def test_cache_lru_eviction():
+    """Test cache keeps the most recently used entries."""
+    cache = GearCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.get("b", "missing") == "missing"
+    assert cache.info == (3, 1, 2)
+
+
+def test_cache_key():
+    """Test cache keys depend on function identity and inputs."""
+    assert GearCache.key(add, {"a": 1, "b": 2}) == GearCache.key(add, {"b": 2, "a": 1})
+    assert GearCache.key(add, {"a": 1, "b": 2}) != GearCache.key(add, {"a": 2, "b": 2})
+    assert GearCache.key(add, {"a": 1}) != GearCache.key(reduce, {"a": 1})
+    assert GearCache.key(add, {"a": lambda: 1}) is None
+
+
+def test_cache_key_code():
+    """Test closures are not cached and keys change with the function code."""
+    assert GearCache.key(make(2), {"a": 5}) is None
+
+    cache = GearCache()
+    for n in (2, 3):
+        run = Network("scaled", outputs=[make(n)]).run(
+            config={"backend": "inline", "cache": cache}, a=5
+        )
+        assert run.result == {"scaled": 5 * n}
+
+    key = GearCache.key(replaced, {"a": 1})
+    code = replaced.__code__
+    try:
+        replaced.__code__ = add.__code__
+        assert GearCache.key(replaced, {"a": 1}) != key
+    finally:
+        replaced.__code__ = code
+
+
+def test_cached_network_run():
+    """Test unchanged gears are served from cache."""
+    calls.clear()
+    network = Network("my-network", outputs=[volatile])
+    config = {"backend": "inline", "cache": GearCache()}
+
+    assert network.run(config=config, a=1, b=1).result == {"volatile": 3}
+    assert network.run(config=config, a=1, b=2).result == {"volatile": 4}
+
+    assert calls == [("expensive", 1), ("volatile", 2), ("volatile", 2)]
+
+
+def test_disk_cache(tmp_path):
+    """Test disk tier survives a fresh in-memory cache."""
+    cache = GearCache(directory=str(tmp_path))
+    key = GearCache.key(add, {"a": 1, "b": 2})
+    cache.put(key, 3)
+
+    fresh = GearCache(maxsize=1, directory=str(tmp_path))
+    assert key in fresh
+    assert fresh.get(key) == 3
+    assert len(fresh) == 1
+
+    fresh.clear()
+    assert key not in fresh
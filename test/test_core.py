@@ -0,0 +1,52 @@
+import pytest
+
+from datagears.engine.core import GraphCore
+from datagears.engine.network import Network
+
+from . import *
+
+
+def test_graph_core_adjacency():
+    """Test CSR adjacency of a graph core."""
+    core = GraphCore("core")
+    core.add_edge("a", "g", param="x")
+    core.add_edge("b", "g", param="y")
+    core.add_edge("g", "out")
+    core.add_edge("a", "h", param="x")
+
+    assert core.nodes == ["a", "g", "b", "out", "h"]
+    assert core.in_edges("g", data="param") == [("a", "g", "x"), ("b", "g", "y")]
+    assert core.out_edges("a") == [("a", "g"), ("a", "h")]
+    assert list(core.predecessors("g")) == ["a", "b"]
+    assert list(core.successors("g")) == ["out"]
+    assert core.in_degree("g") == 2
+
+    order = [core.node(node_id) for node_id in core.topological_order()]
+    assert order.index("g") < order.index("out")
+    assert order.index("b") < order.index("g")
+
+
+def test_graph_core_cycle():
+    """Test cyclic graphs have no topological order."""
+    core = GraphCore("cycle")
+    core.add_edge("a", "b")
+    core.add_edge("b", "a")
+
+    with pytest.raises(ValueError):
+        core.topological_order()
+
+
+def test_graph_core_networkx():
+    """Test networkx graphs are materialized on demand and cached per version."""
+    network = Network("my-network", outputs=[my_out])
+    core = network.core
+
+    graph = network.graph
+    assert network.graph is graph
+    assert graph.number_of_nodes() == len(core)
+    assert graph.number_of_edges() == sum(
+        1 for node in core for _ in core.out_edges(node)
+    )
+
+    core.add_edge("extra", core.nodes[0])
+    assert network.graph is not graph
@@ -0,0 +1,238 @@
+import multiprocessing
+import os
+import pickle
+import threading
+import time
+
+import pytest
+
+from datagears.engine.distributed import (DistributedBackend,
+                                          InMemoryTaskQueue, RedisTaskQueue,
+                                          TaskQueueServer, WorkerLostError,
+                                          connect, work)
+from datagears.engine.network import Depends, Network
+from datagears.engine.nodes import GearException
+
+from . import *
+
+
+def crash_once(marker: str) -> int:
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(1)
+
+    return os.getpid()
+
+
+def failing(a: int) -> int:
+    raise ValueError(a)
+
+
+def sleeping(a: int) -> int:
+    time.sleep(0.2)
+    return a
+
+
+def failing_pair(f: int = Depends(failing), s: int = Depends(sleeping)) -> int:
+    return f + s
+
+
+class LockedError(Exception):
+    """Error holding a lock, it can not be pickled."""
+
+    def __init__(self) -> None:
+        super().__init__("locked")
+        self.lock = threading.Lock()
+
+
+def locked(a: int) -> int:
+    raise LockedError()
+
+
+class BrokenQueue(InMemoryTaskQueue):
+    """Queue losing its connection when results are polled."""
+
+    def results(self):
+        raise ConnectionError("queue is gone")
+
+
+def _worker(address, authkey) -> None:
+    """Worker process serving the queue of a server."""
+    work(connect(address, authkey), idle_timeout=1.0)
+
+
+def test_distributed_threads():
+    """Test worker threads execute gears pulled from an in-memory queue."""
+    queue = InMemoryTaskQueue()
+    stop = threading.Event()
+    workers = [
+        threading.Thread(target=work, args=(queue,), kwargs={"stop": stop})
+        for _ in range(3)
+    ]
+    for worker in workers:
+        worker.start()
+
+    network = Network("my-network", outputs=[my_out])
+    try:
+        with DistributedBackend(queue) as backend:
+            for a in range(3):
+                run = network.run(config={"backend": backend}, a=a, b=2, c=2)
+                assert run.result == {"my_out": a / 2}
+    finally:
+        stop.set()
+        for worker in workers:
+            worker.join()
+
+
+def test_distributed_worker_processes(tmp_path):
+    """Test worker processes connect over a socket and tasks survive a crash."""
+    with TaskQueueServer(lease=0.5) as server:
+        workers = [
+            multiprocessing.Process(target=_worker, args=(server.address, b"datagears"))
+            for _ in range(2)
+        ]
+        for worker in workers:
+            worker.start()
+
+        network = Network("crashing", outputs=[crash_once])
+        with DistributedBackend(server.queue()) as backend:
+            run = network.run(
+                config={"backend": backend}, marker=str(tmp_path / "marker")
+            )
+            assert run.result["crash_once"] in {worker.pid for worker in workers}
+
+        for worker in workers:
+            worker.join(timeout=10)
+            assert not worker.is_alive()
+
+
+def test_task_retries_exhausted():
+    """Test tasks of lost workers fail once they run out of retries."""
+    queue = InMemoryTaskQueue(lease=0.0, max_retries=1)
+    queue.put("task", pickle.dumps((add, {"a": 1})))
+
+    assert queue.take(timeout=0)[0] == "task"
+    assert queue.take(timeout=0)[0] == "task"
+    assert queue.take(timeout=0) is None
+
+    [(task_id, payload)] = queue.results()
+    ok, error = pickle.loads(payload)
+    assert task_id == "task" and not ok
+    assert isinstance(error, WorkerLostError)
+
+
+def test_redis_task_queue():
+    """Test the Redis task queue with several clients of one server."""
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    driver = RedisTaskQueue(fakeredis.FakeRedis(server=server), lease=0.5)
+    worker_queue = RedisTaskQueue(fakeredis.FakeRedis(server=server), lease=0.5)
+
+    stop = threading.Event()
+    worker = threading.Thread(target=work, args=(worker_queue,), kwargs={"stop": stop})
+    worker.start()
+
+    network = Network("my-network", outputs=[my_out, add])
+    try:
+        with DistributedBackend(driver) as backend:
+            run = network.run(config={"backend": backend}, a=5, b=2, c=3)
+            assert run.result == {"my_out": 2.0, "add": 7}
+    finally:
+        stop.set()
+        worker.join()
+
+
+def test_distributed_failed_run():
+    """Test results of cancelled or corrupt tasks do not stop the collector."""
+    queue = InMemoryTaskQueue()
+    stop = threading.Event()
+    workers = [
+        threading.Thread(target=work, args=(queue,), kwargs={"stop": stop})
+        for _ in range(2)
+    ]
+    for worker in workers:
+        worker.start()
+
+    try:
+        with DistributedBackend(queue) as backend:
+            with pytest.raises(GearException):
+                Network("failing", outputs=[failing_pair]).run(
+                    config={"backend": backend}, a=1
+                )
+
+            # NOTE: The sleeping gear posts its result after the run failed.
+            time.sleep(0.4)
+            run = Network("my-network", outputs=[my_out]).run(
+                config={"backend": backend}, a=4, b=2, c=2
+            )
+            assert run.result == {"my_out": 2.0}
+
+            stop.set()
+            for worker in workers:
+                worker.join()
+
+            future = backend.submit(add, {"a": 1})
+            task_id, _, _ = queue.take(timeout=0)
+            queue.complete(task_id, b"corrupt")
+            with pytest.raises(Exception):
+                future.result(timeout=5)
+            assert backend.submit(add, {"a": 1}).cancel()
+    finally:
+        stop.set()
+        for worker in workers:
+            worker.join()
+
+
+def test_redis_task_queue_lost_claim():
+    """Test tasks claimed by a worker lost before leasing them are requeued."""
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeRedis()
+    queue = RedisTaskQueue(client, name="tasks", lease=0.2)
+    queue.put("task", pickle.dumps((add, {"a": 1})))
+
+    # NOTE: The worker died right after popping the task.
+    assert client.lmove("tasks:pending", "tasks:processing") == b"task"
+    assert queue.take(timeout=0) is None
+
+    assert queue.results() == []
+    time.sleep(0.3)
+    assert queue.results() == []
+
+    task_id, payload, _ = queue.take(timeout=0)
+    assert task_id == "task"
+    queue.complete(task_id, pickle.dumps((True, 11)))
+    assert queue.results() == [("task", pickle.dumps((True, 11)))]
+    assert client.llen("tasks:processing") == 0
+
+
+def test_worker_unpicklable_error():
+    """Test errors which can not be pickled still answer their task."""
+    queue = InMemoryTaskQueue()
+    queue.put("task", pickle.dumps((locked, {"a": 1})))
+
+    assert work(queue, max_tasks=1) == 1
+    [(task_id, payload)] = queue.results()
+    ok, error = pickle.loads(payload)
+    assert not ok and isinstance(error, GearException)
+    assert error.gear == "locked" and "LockedError" in str(error)
+
+
+def test_distributed_shutdown_fails_pending():
+    """Test shutting a backend down fails calls which are still waiting."""
+    backend = DistributedBackend(InMemoryTaskQueue())
+    future = backend.submit(add, {"a": 1})
+    backend.shutdown()
+
+    with pytest.raises(RuntimeError, match="shut down"):
+        future.result(timeout=5)
+
+
+def test_distributed_lost_queue():
+    """Test a queue failing while polled fails waiting and later calls."""
+    with DistributedBackend(BrokenQueue()) as backend:
+        future = backend.submit(add, {"a": 1})
+        with pytest.raises(ConnectionError):
+            future.result(timeout=5)
+
+        with pytest.raises(RuntimeError, match="lost its task queue"):
+            backend.submit(add, {"a": 1})
@@ -1,7 +1,11 @@
-from test import add
+import time
+from test import add, my_out
 
+from datagears.engine.analysis import hints
+from datagears.engine.backends import InlineBackend
 from datagears.engine.engine import LocalEngine
-from datagears.engine.network import Network
+from datagears.engine.network import Depends, Network
+from datagears.engine.worker import EXECUTE_CHAIN
 
 
 def test_local_engine():
@@ -11,3 +15,121 @@ def test_local_engine():
     future = engine._executor.submit(add, 2, 3)
 
     assert future
+
+
+def slow() -> float:
+    time.sleep(0.5)
+    return time.time()
+
+
+def fast() -> float:
+    return time.time()
+
+
+def fast_next(t: float = Depends(fast)) -> float:
+    return time.time()
+
+
+def fast_last(t: float = Depends(fast_next)) -> float:
+    return time.time()
+
+
+def join(s: float = Depends(slow), f: float = Depends(fast_last)) -> float:
+    return s - f
+
+
+def test_ready_queue_scheduling():
+    """Test independent branches do not wait for slow gears."""
+    network = Network("my-net", outputs=[join])
+    run = network.run(output_all=True)
+
+    assert run.result["fast_last"] < run.result["slow"]
+    assert run.result["join"] > 0
+
+
+def blob(size: int) -> bytes:
+    return b"x" * size
+
+
+def grow(data: bytes = Depends(blob)) -> bytes:
+    return data * 2
+
+
+def grow_more(data: bytes = Depends(grow)) -> bytes:
+    return data * 2
+
+
+def shrink(data: bytes = Depends(grow_more)) -> int:
+    return len(data)
+
+
+def test_release_intermediates():
+    """Test intermediate results are freed once their consumers are done."""
+    network = Network("my-network", outputs=[shrink])
+    plan = network.compile()
+
+    engine = LocalEngine(network, backend="inline")
+    assert engine.run(size=1 << 20) == {"shrink": 4 << 20}
+    assert engine.state.outputs["grow"] is None
+    assert 6 << 20 < engine.peak_memory < 7 << 20
+
+    kept = LocalEngine(network, backend="inline", release=False)
+    kept.run(size=1 << 20)
+    assert kept.state.outputs["grow"] == b"x" * (2 << 20)
+    assert kept.peak_memory > 7 << 20
+
+    assert engine.update(size=1 << 20) == {"shrink": 4 << 20}
+    assert engine.state.outstanding == []
+    assert engine.update(output_all=True)["grow"] == b"x" * (2 << 20)
+
+    engine.state.update_input({"size": 1})
+    outstanding = [plan.gear(gear_id).name for gear_id in engine.state.outstanding]
+    assert outstanding == ["blob", "grow", "grow_more", "shrink"]
+
+
+class CountingBackend(InlineBackend):
+    """Inline backend recording submitted targets."""
+
+    def __init__(self) -> None:
+        self.submitted = []
+
+    def submit(self, target, kwargs: dict):
+        self.submitted.append(getattr(target, "name", target))
+        return super().submit(target, kwargs)
+
+
+@hints(fuse=False)
+def measure(data: bytes = Depends(grow)) -> int:
+    return len(data)
+
+
+def test_fused_chains():
+    """Test linear chains of gears run as a single task."""
+    backend = CountingBackend()
+    engine = LocalEngine(
+        Network("my-network", outputs=[shrink]), backend=backend, fuse=True
+    )
+
+    assert engine.run(size=4) == {"shrink": 16}
+    assert backend.submitted == [EXECUTE_CHAIN.name]
+    assert engine.state.outputs["grow"] is None
+    assert engine.update(size=8) == {"shrink": 32}
+    assert engine.run(outputs=[grow], size=4) == {"grow": b"x" * 8}
+    assert len(backend.submitted) == 3
+
+    backend.submitted.clear()
+    engine = LocalEngine(
+        Network("my-network", outputs=[my_out]), backend=backend, fuse=True
+    )
+    assert engine.run(a=1, b=2, c=3) == {"my_out": 0.0}
+    assert sorted(backend.submitted) == ["add_one", EXECUTE_CHAIN.name, "my_out"]
+
+    backend.submitted.clear()
+    engine = LocalEngine(
+        Network("my-network", outputs=[measure]), backend=backend, fuse=True
+    )
+    assert engine.run(size=4) == {"measure": 8}
+    assert backend.submitted == [EXECUTE_CHAIN.name, "measure"]
+
+    run = Network("my-network", outputs=[shrink]).run(config={"fuse": True}, size=4)
+    assert run.result == {"shrink": 16}
@@ -1,6 +1,9 @@
+import sys
+
 import pytest
 
-from datagears.engine.network import Network
+from datagears.engine.network import Depends, Network
+from datagears.engine.nodes import Gear
 
 from . import *
 
@@ -28,3 +31,162 @@ def test_network_set_input():
     new_values = {"a": 1, "b": 2, "c": 3}
     network._set_input(new_values)
     assert network.inputs == new_values
+
+
+def load(path: str) -> list:
+    return [len(path)] * 3
+
+
+def head(data: list = Depends(load)) -> int:
+    return data[0]
+
+
+def tail(rows: list = Depends(load)) -> int:
+    return data_sum(rows[1:])
+
+
+def data_sum(values: list) -> int:
+    return sum(values)
+
+
+def combine(h: int = Depends(head), t: int = Depends(tail)) -> int:
+    return h + t
+
+
+def test_network_shared_dependency():
+    """Test diamond shaped networks contain each gear exactly once."""
+    network = Network("my-network", outputs=[combine, head])
+
+    gears = [node for node in network.graph.nodes if isinstance(node, Gear)]
+    assert sorted(gear.name for gear in gears) == ["combine", "head", "load", "tail"]
+
+    (load_gear,) = [gear for gear in gears if gear.name == "load"]
+    (load_output,) = network.graph.successors(load_gear)
+    edges = network.graph.out_edges(load_output, data="param")
+    assert {param for _, _, param in edges} == {"data", "rows"}
+    assert network.input_shape == {"path": str}
+
+    run = network.run(output_all=True, path="abcd")
+    assert run.result == {"load": [4, 4, 4], "head": 4, "tail": 8, "combine": 12}
+
+
+def chained(dependency):
+    def link(x: int = Depends(dependency)) -> int:
+        return x + 1
+
+    return link
+
+
+def test_network_deep_chain():
+    """Test chains deeper than the recursion limit can be constructed."""
+    gear = my_out
+    for _ in range(sys.getrecursionlimit()):
+        gear = chained(gear)
+
+    network = Network("deep", outputs=[gear])
+    assert len(network.compile().gears) == sys.getrecursionlimit() + 4
+
+
+def test_network_run_update():
+    """Test re-running recomputes only the downstream cone of changed inputs."""
+    network = Network("my-network", outputs=[my_out])
+    run = network.run(config={"backend": "inline"}, a=1, b=2, c=3)
+    plan = network.compile()
+
+    invalidated = run._set_input({"c": 5})
+    assert {plan.gear(gear_id).name for gear_id in invalidated} == {"reduce", "my_out"}
+    assert run._set_input({"c": 5}) == set()
+
+    assert run.update() == {"my_out": -1.0}
+    assert run.timings.keys() == {"reduce", "my_out"}
+    assert run.update(a=7) == {"my_out": 2.0}
+    assert run.timings.keys() == {"add", "reduce", "my_out"}
+    assert run.inputs == {"a": 7, "b": 2, "c": 5}
+
+    with pytest.raises(ValueError):
+        run.update(d=1)
+
+
+def test_network_cached_properties():
+    """Test structural properties are computed once until the graph changes."""
+    from datagears.engine.nodes import GearInput
+
+    network = Network("my-network", outputs=[my_out])
+
+    assert network.input_nodes is network.input_nodes
+    assert network.compile() is network.compile()
+    assert {gear.name for gear in network.roots} == {"add", "add_one"}
+    assert [{gear.name for gear in level} for level in network.levels] == [
+        {"add", "add_one"},
+        {"reduce"},
+        {"my_out"},
+    ]
+    assert {gear.name: out.name for gear, out in network.gear_outputs.items()} == {
+        "my_out": "my_out",
+        "reduce": "reduce",
+        "add": "add",
+        "add_one": "add_one",
+    }
+    with pytest.raises(TypeError):
+        network.input_nodes["a"] = ()
+    with pytest.raises(TypeError):
+        del network.gear_outputs[network.roots[0]]
+    assert isinstance(network.levels, tuple)
+
+    plan = network.compile()
+    (add_gear,) = [gear for gear in network.roots if gear.name == "add"]
+    network.core.add_edge(GearInput("d", 4, graph=network.core), add_gear, param="d")
+
+    assert network.input_shape.keys() == {"a", "b", "c", "d"}
+    assert network.compile() is not plan
+
+
+def test_network_run_outputs():
+    """Test runs for a subset of gears execute and require only their cone."""
+    network = Network("my-network", outputs=[my_out])
+    config = {"backend": "inline"}
+
+    run = network.run(config=config, outputs=[add_one])
+    assert run.result == {"add_one": 1}
+
+    run = network.run(config=config, output_all=True, outputs=["reduce"], a=1, b=2, c=3)
+    assert run.result == {"add": 3, "reduce": 0}
+    assert run.update(c=1) == {"add": 3, "reduce": 2}
+
+    run = network.run(config=config, outputs=[add, my_out], a=1, b=2, c=3)
+    assert run.result == {"add": 3, "my_out": 0.0}
+
+    with pytest.raises(ValueError):
+        network.run(config=config, outputs=[reduce], a=1, b=2)
+
+    with pytest.raises(ValueError):
+        network.run(config=config, outputs=["missing"])
+
+
+def configured(config: dict) -> dict:
+    return config
+
+
+def selected(outputs: list) -> list:
+    return outputs
+
+
+def test_network_reserved_inputs():
+    """Test inputs named like arguments of runs are rejected."""
+    with pytest.raises(ValueError, match="config"):
+        Network("my-network", outputs=[configured])
+
+    with pytest.raises(ValueError, match="outputs"):
+        Network("my-network", outputs=[selected])
+
+
+def batched(batch: int) -> int:
+    return batch * 2
+
+
+def test_network_inputs_named_like_run_options():
+    """Test inputs named like options of a run reach their gears."""
+    network = Network("my-network", outputs=[batched])
+    run = network.run(config={"backend": "inline"}, batch=3)
+
+    assert run.result == {"batched": 6}
@@ -0,0 +1,58 @@
+import pytest
+
+from datagears.engine.network import Network
+from datagears.engine.plan import ExecutionPlan
+
+from . import *
+
+
+def test_network_compile():
+    """Test network compilation into an execution plan."""
+    network = Network("my-network", outputs=[my_out])
+    plan = network.compile()
+
+    assert isinstance(plan, ExecutionPlan)
+    assert network.compile() is plan
+    assert plan.input_shape == network.input_shape
+
+    names = [plan.gear(gear_id).name for gear_id in plan.gears]
+    assert names.index("add") < names.index("reduce") < names.index("my_out")
+    assert [plan.gear(gear_id).name for gear_id in plan.output_gears] == ["my_out"]
+    assert len(plan.levels) == 3
+    assert {
+        plan.gear(gear_id).name: plan.dependencies[gear_id] for gear_id in plan.gears
+    } == {"add": 0, "add_one": 0, "reduce": 1, "my_out": 2}
+
+    with pytest.raises(AttributeError):
+        plan.gears = ()
+
+
+def test_plan_run_state():
+    """Test per-run value stores are independent of each other."""
+    plan = Network("my-network", outputs=[my_out]).compile()
+
+    first, second = plan.new_run(), plan.new_run()
+    first.set_input({"a": 1, "b": 2, "c": 3})
+    second.set_input({"a": 4, "b": 5, "c": 6})
+
+    with pytest.raises(ValueError):
+        plan.new_run().set_input({"a": 1})
+
+    assert first.inputs == {"a": 1, "b": 2, "c": 3}
+    assert second.inputs == {"a": 4, "b": 5, "c": 6}
+
+    add_id = next(g for g in plan.gears if plan.gear(g).name == "add")
+    assert first.arguments(add_id) == {"a": 1, "b": 2}
+    assert second.arguments(add_id) == {"a": 4, "b": 5}
+
+
+def test_network_run_reuses_plan():
+    """Test runs share the compiled plan and leave the network untouched."""
+    network = Network("my-network", outputs=[my_out])
+    plan = network.compile()
+
+    assert network.run(a=1, b=2, c=3).result == {"my_out": 0.0}
+    assert network.run(a=10, b=2, c=2).result == {"my_out": 5.0}
+
+    assert network.compile() is plan
+    assert network.inputs == {"a": None, "b": 10, "c": None}
@@ -0,0 +1,90 @@
+import time
+
+from datagears.engine.network import Depends, Network
+from datagears.engine.plot import NetworkPlot, critical_path
+
+from . import *
+
+
+def slow_source() -> int:
+    time.sleep(0.2)
+    return 1
+
+
+def fast_source() -> int:
+    return 2
+
+
+def slow_sink(s: int = Depends(slow_source), f: int = Depends(fast_source)) -> int:
+    return s + f
+
+
+def test_run_timings():
+    """Test runs record start and end of every gear."""
+    run = Network("my-network", outputs=[my_out]).run(a=1, b=2, c=3)
+
+    assert run.timings.keys() == {"add", "add_one", "reduce", "my_out"}
+    assert all(0 <= start <= end for start, end in run.timings.values())
+    assert run.timings["add"][1] <= run.timings["reduce"][0]
+
+
+def test_critical_path():
+    """Test critical path and slack from synthetic timings."""
+    network = Network("my-network", outputs=[my_out])
+    timings = {
+        "add": (0.0, 3.0),
+        "add_one": (0.0, 1.0),
+        "reduce": (3.0, 4.0),
+        "my_out": (4.0, 5.0),
+    }
+
+    path, slack = critical_path(network.graph, timings)
+
+    assert path == ["add", "reduce", "my_out"]
+    assert slack == {"add": 0.0, "add_one": 3.0, "reduce": 0.0, "my_out": 0.0}
+
+
+def test_critical_path_overlay():
+    """Test plot overlay of a completed run."""
+    run = Network("my-network", outputs=[slow_sink]).run(config={"backend": "thread"})
+    plot = run.plot
+
+    assert isinstance(plot, NetworkPlot)
+    assert plot.critical_path == ["slow_source", "slow_sink"]
+    assert plot.slack["fast_source"] > 0.1
+
+    nodes = {
+        name: entries[0]["attributes"] for name, entries in plot.meta["nodes"].items()
+    }
+    slow = nodes["gear_slow_source"]
+    assert slow["color"] == "red"
+    assert "ms" in slow["label"]
+
+    edges = [edge[0]["attributes"] for edge in plot.meta["edges"].values()]
+    assert sum(1 for attrs in edges if attrs.get("color") == "red") == 2
+
+
+def test_run_plot_values():
+    """Test run plots label data nodes with values of the run."""
+    network = Network("my-network", outputs=[my_out])
+    run = network.run(config={"backend": "inline"}, a=1, b=2, c=3)
+
+    values = {
+        node.name: value
+        for node, value in run.graph.nodes(data="value")
+        if node.name_uniq.startswith("data_")
+    }
+    assert values == {
+        "a": 1,
+        "b": 2,
+        "c": 3,
+        "add": 3,
+        "reduce": 0,
+        "add_one": 1,
+        "my_out": 0.0,
+    }
+
+    (run_node,) = run.plot.meta["nodes"]["data_my_out"]
+    (network_node,) = network.plot.meta["nodes"]["data_my_out"]
+    assert "= 0.0" in run_node["attributes"]["label"]
+    assert "= None" in network_node["attributes"]["label"]
@@ -0,0 +1,67 @@
+import os
+
+from datagears.engine.engine import LocalEngine
+from datagears.engine.network import Network
+from datagears.engine.pool import WorkerPool
+
+from . import *
+
+
+def worker_pid() -> int:
+    return os.getpid()
+
+
+def test_pool_lifecycle():
+    """Test worker pool start, warmup and shutdown."""
+    with WorkerPool(max_workers=2) as pool:
+        assert not pool.is_running
+
+        pids = pool.warmup()
+        assert len(pids) == 2
+        assert pool.is_running
+
+    assert not pool.is_running
+
+
+def test_pool_shared_across_runs():
+    """Test a single pool serves many network runs."""
+    network = Network("my-network", outputs=[my_out])
+
+    with WorkerPool(max_workers=2) as pool:
+        pool.warmup()
+        executor = pool.executor
+
+        for a in range(3):
+            run = network.run(config={"pool": pool}, a=a, b=2, c=2)
+            assert run.result == {"my_out": a / 2}
+
+        assert pool.executor is executor
+
+
+def test_engine_default_pool():
+    """Test engines fall back to the process-wide pool."""
+    network = Network("my-network", outputs=[add])
+
+    assert LocalEngine(network).pool is WorkerPool.default()
+    assert LocalEngine(network).pool is LocalEngine(network).pool
+
+
+def test_engine_process_backend_uses_pool():
+    """Test the process backend selected by name runs on the configured pool."""
+    network = Network("my-network", outputs=[add])
+
+    with WorkerPool(max_workers=1) as pool:
+        engine = LocalEngine(network, pool=pool, backend="process")
+        assert engine.backend.pool is pool
+
+
+def test_default_backend_uses_configured_pool():
+    """Test runs without a backend execute gears on the configured pool."""
+    network = Network("pids", outputs=[worker_pid])
+
+    with WorkerPool(max_workers=1) as pool:
+        assert LocalEngine(network, pool=pool).backend.pool is pool
+
+        pids = pool.warmup()
+        run = network.run(config={"pool": pool})
+        assert run.result["worker_pid"] in pids
@@ -0,0 +1,55 @@
+import pytest
+
+from datagears import engine
+from datagears.engine.engine import LocalEngine
+from datagears.engine.network import Network
+from datagears.engine.registry import InMemoryRedis, NetworkRegistry
+
+from . import *
+
+
+def test_register_and_get_networks():
+    """Test registered networks are rebuilt and run by name."""
+    registry = engine.init()
+    network = Network("my-network", outputs=[my_out])
+
+    assert network.register() == "my-network"
+    assert "networkx" not in network.core._views
+    assert LocalEngine(Network("adder", outputs=[add])).register() == "adder"
+    assert registry.names == ["adder", "my-network"]
+
+    networks = engine.get_networks()
+    assert [n.graph.name for n in networks] == ["adder", "my-network"]
+
+    run = networks[1].run(config={"backend": "inline"}, a=1, b=2, c=3)
+    assert run.result == {"my_out": 0.0}
+
+    assert registry.unregister("adder")
+    assert not registry.unregister("adder")
+    with pytest.raises(KeyError):
+        registry.get("adder")
+
+
+def test_register_requires_importable_gears():
+    """Test gears which workers can not import are rejected."""
+
+    def local(a: int) -> int:
+        return a
+
+    with pytest.raises(ValueError):
+        NetworkRegistry(InMemoryRedis()).register(Network("local", outputs=[local]))
+
+
+def test_registry_fakeredis():
+    """Test networks registered by one client are fetched by another."""
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+
+    engine.init({"client": fakeredis.FakeRedis(server=server)})
+    Network("my-network", outputs=[my_out, add]).register()
+
+    registry = NetworkRegistry(fakeredis.FakeRedis(server=server))
+    network = registry.get("my-network")
+
+    run = network.run(config={"backend": "inline"}, a=5, b=2, c=3)
+    assert run.result == {"my_out": 2.0, "add": 7}
@@ -0,0 +1,110 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from datagears.engine.network import Network
+
+from . import *
+
+calls = []
+gate = threading.Event()
+
+
+def held(a: int) -> int:
+    calls.append(a)
+    gate.wait(5)
+    return a * 10
+
+
+def test_serve_micro_batches():
+    """Test concurrent requests are gathered into batched runs."""
+    network = Network("my-network", outputs=[my_out])
+
+    with network.serve(
+        max_batch_size=8, max_wait=0.2, config={"backend": "thread"}
+    ) as server:
+        futures = [server.submit(a=a, b=2, c=2) for a in range(8)]
+        assert [future.result() for future in futures] == [
+            {"my_out": a / 2} for a in range(8)
+        ]
+
+    assert server.requests == 8
+    assert server.batches == 1
+
+
+def test_serve_coalesces_identical_requests():
+    """Test identical in-flight requests share a single computation."""
+    calls.clear()
+    gate.clear()
+    network = Network("held", outputs=[held])
+
+    with network.serve(max_wait=0, config={"backend": "thread"}) as server:
+        first = server.submit(a=1)
+        time.sleep(0.05)
+        second = server.submit(a=1)
+        gate.set()
+
+        assert first is not second
+        assert second.result() == {"held": 10}
+        assert first.result() == {"held": 10}
+        assert first.result() is not second.result()
+
+        first.result()["held"] = 0
+        assert second.result() == {"held": 10}
+        assert server.run(a=1) == {"held": 10}
+
+    assert calls == [1, 1]
+    assert server.coalesced == 1
+
+
+def test_serve_isolates_failures():
+    """Test a bad request fails only its own caller."""
+    network = Network("my-network", outputs=[my_out])
+
+    async def main(server):
+        return await asyncio.gather(
+            server.arun(a=1, b=2, c=2),
+            server.arun(a="x", b=2, c=2),
+            return_exceptions=True,
+        )
+
+    with network.serve(max_wait=0.2, config={"backend": "thread"}) as server:
+        good, bad = asyncio.run(main(server))
+
+    assert good == {"my_out": 0.5}
+    assert isinstance(bad, Exception)
+
+    with pytest.raises(RuntimeError):
+        server.submit(a=1, b=2, c=2)
+
+
+def test_serve_cancelled_callers():
+    """Test cancelled callers do not affect their batch or coalesced callers."""
+    calls.clear()
+    gate.clear()
+    network = Network("held", outputs=[held])
+
+    with network.serve(
+        max_batch_size=4, max_wait=0.1, config={"backend": "thread"}
+    ) as server:
+        futures = [server.submit(a=a) for a in range(4)]
+        twin = server.submit(a=0)
+        assert futures[0].cancel()
+
+        gate.set()
+        assert [future.result(timeout=5) for future in futures[1:]] == [
+            {"held": a * 10} for a in range(1, 4)
+        ]
+        assert twin.result(timeout=5) == {"held": 0}
+
+    async def timed_out():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(server.arun(a=5), 0.01)
+
+    gate.clear()
+    with network.serve(max_wait=0, config={"backend": "thread"}) as server:
+        asyncio.run(timed_out())
+        gate.set()
+        assert server.run(a=5) == {"held": 50}
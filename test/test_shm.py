@@ -0,0 +1,145 @@
+import os
+import time
+
+import pytest
+
+from datagears.engine.analysis import hints
+from datagears.engine.engine import LocalEngine
+from datagears.engine.network import Depends, Network
+from datagears.engine.nodes import GearException
+from datagears.engine.pool import WorkerPool
+from datagears.engine.shm import SharedHandle, SharedMemoryTransport, share
+
+np = pytest.importorskip("numpy")
+
+
+def frame(rows: int) -> "np.ndarray":
+    return np.arange(rows * 1024, dtype=np.float64).reshape(rows, 1024)
+
+
+def total(data: "np.ndarray" = Depends(frame)) -> float:
+    assert not data.flags.writeable
+    return float(data.sum())
+
+
+def column(data: "np.ndarray" = Depends(frame)) -> "np.ndarray":
+    return data[:, 0].copy()
+
+
+@hints(backend="thread")
+def local_total(data: "np.ndarray" = Depends(frame)) -> float:
+    assert not data.flags.writeable
+    return float(data.sum())
+
+
+def payload(size: int) -> bytes:
+    return b"x" * size
+
+
+def length(data: bytes = Depends(payload)) -> int:
+    assert isinstance(data, memoryview)
+    return data.nbytes
+
+
+def slow_payload(size: int) -> bytes:
+    time.sleep(0.3)
+    return b"x" * size
+
+
+def broken(size: int) -> int:
+    raise ValueError(size)
+
+
+def broken_pair(
+    data: bytes = Depends(slow_payload), error: int = Depends(broken)
+) -> int:
+    return len(data) + error
+
+
+def _segments() -> set:
+    """Shared memory segments currently present on the system."""
+    return set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+
+
+def test_share_threshold():
+    """Test only large buffers are moved into shared memory."""
+    transport = SharedMemoryTransport(threshold=1024)
+
+    small = np.zeros(8)
+    assert share(small, transport.threshold) is small
+    assert share(b"abc", transport.threshold) == b"abc"
+    assert share([1, 2, 3], transport.threshold) == [1, 2, 3]
+
+    handle = share(np.ones((64, 64)), transport.threshold)
+    assert isinstance(handle, SharedHandle)
+    assert handle.shape == (64, 64)
+
+    transport.track(handle)
+    assert transport.live == 1
+
+    value = transport.materialize(handle)
+    assert value.flags.writeable
+    assert value.sum() == 64 * 64
+
+    transport.release(handle)
+    assert transport.live == 0
+
+
+def test_shared_memory_process_backend():
+    """Test large arrays pass between worker processes through shared memory."""
+    network = Network("my-network", outputs=[total, column])
+    expected = frame(256)
+    before = _segments()
+
+    with WorkerPool(max_workers=2) as pool:
+        engine = LocalEngine(network, pool=pool, backend="process", shared_memory=1024)
+        result = engine.run(rows=256)
+
+        assert result["total"] == float(expected.sum())
+        assert np.array_equal(result["column"], expected[:, 0])
+        assert engine._transport.live == 0
+
+        result = engine.run(output_all=True, rows=256)
+        assert np.array_equal(result["frame"], expected)
+        assert result["frame"].flags.writeable
+        assert engine._transport.live == 0
+
+    assert _segments() <= before
+
+
+def test_shared_memory_bytes():
+    """Test large bytes reach consumers as read-only memoryviews."""
+    network = Network("my-network", outputs=[length])
+
+    with WorkerPool(max_workers=1) as pool:
+        run = network.run(
+            config={"pool": pool, "backend": "process", "shared_memory": 1024},
+            size=4096,
+        )
+        assert run.result == {"length": 4096}
+
+
+def test_shared_memory_local_backend():
+    """Test gears in this process read shared results as zero-copy views."""
+    network = Network("my-network", outputs=[local_total])
+
+    with WorkerPool(max_workers=1) as pool:
+        engine = LocalEngine(network, pool=pool, shared_memory=1024)
+        assert engine.run(rows=16) == {"local_total": float(frame(16).sum())}
+        assert engine._transport.live == 0
+
+
+def test_shared_memory_failed_run():
+    """Test segments of calls finishing after a failed run are freed."""
+    network = Network("my-network", outputs=[broken_pair])
+    before = _segments()
+
+    with WorkerPool(max_workers=2) as pool:
+        pool.warmup()
+        engine = LocalEngine(network, pool=pool, shared_memory=1024)
+        with pytest.raises(GearException):
+            engine.run(size=4096)
+
+        time.sleep(0.6)
+
+    assert _segments() <= before
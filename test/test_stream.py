@@ -0,0 +1,73 @@
+import itertools
+
+import pytest
+
+from datagears.engine.network import Depends, Network
+from datagears.engine.nodes import GearException
+
+from . import *
+
+produced = []
+
+
+def numbers(limit: int):
+    for i in range(limit):
+        produced.append(i)
+        yield i
+
+
+def square(n: int = Depends(numbers), power: int = 2) -> int:
+    return n ** power
+
+
+def label(value: int = Depends(square), n: int = Depends(numbers)) -> str:
+    return f"{n}:{value}"
+
+
+def broken(n: int = Depends(numbers)) -> int:
+    return 1 // (n - 2)
+
+
+def test_stream_network():
+    """Test values of yielding gears flow element by element."""
+    network = Network("my-network", outputs=[label, square])
+
+    rows = list(network.stream(limit=4, power=3))
+
+    assert rows == [
+        {"label": "0:0", "square": 0},
+        {"label": "1:1", "square": 1},
+        {"label": "2:8", "square": 8},
+        {"label": "3:27", "square": 27},
+    ]
+
+
+def test_stream_backpressure():
+    """Test bounded buffers keep producers close to consumers."""
+    produced.clear()
+    network = Network("my-network", outputs=[square])
+    rows = network.stream(config={"buffer_size": 2}, limit=10 ** 9, power=2)
+
+    first = list(itertools.islice(rows, 5))
+    rows.close()
+
+    assert [row["square"] for row in first] == [0, 1, 4, 9, 16]
+    assert len(produced) < 20
+
+
+def test_stream_constant_network():
+    """Test networks without yielding gears produce a single row."""
+    network = Network("my-network", outputs=[my_out])
+
+    assert list(network.stream(a=1, b=2, c=3)) == [{"my_out": 0.0}]
+
+
+def test_stream_failure():
+    """Test failures of a stage reach the consumer."""
+    network = Network("my-network", outputs=[broken])
+    rows = network.stream(limit=5)
+
+    assert next(rows) == {"broken": -1}
+    assert next(rows) == {"broken": -1}
+    with pytest.raises(GearException):
+        next(rows)
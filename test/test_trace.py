@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from datagears.engine.network import Network
+from datagears.engine.trace import RunTrace
+
+from . import *
+
+
+@pytest.mark.parametrize("backend", ["inline", "process"])
+def test_run_trace(backend):
+    """Test runs record a span per gear."""
+    network = Network("my-network", outputs=[my_out])
+    run = network.run(config={"backend": backend, "trace": True}, a=1, b=2, c=3)
+
+    assert run.result == {"my_out": 0.0}
+    assert isinstance(run.trace, RunTrace)
+    assert sorted(span.gear for span in run.trace) == [
+        "add",
+        "add_one",
+        "my_out",
+        "reduce",
+    ]
+
+    for span in run.trace:
+        assert span.submitted <= span.received
+        assert span.execution >= 0
+        assert span.queue_wait >= 0 and span.transfer >= 0
+        if backend == "process":
+            assert span.input_bytes > 0 and span.output_bytes > 0
+        else:
+            assert span.input_bytes is None
+
+
+def test_run_trace_disabled():
+    """Test tracing is off by default."""
+    run = Network("my-network", outputs=[add]).run(a=1, b=2)
+
+    assert run.trace is None
+
+
+def test_chrome_trace_export(tmp_path):
+    """Test traces export to Chrome trace-event JSON."""
+    network = Network("my-network", outputs=[my_out])
+    run = network.run(config={"backend": "thread", "trace": True}, a=1, b=2, c=3)
+
+    path = tmp_path / "trace.json"
+    run.trace.dump(str(path))
+    events = json.loads(path.read_text())["traceEvents"]
+
+    assert len(events) == 4
+    assert {event["ph"] for event in events} == {"X"}
+    assert {"queue_wait_ms", "transfer_ms"} <= events[0]["args"].keys()
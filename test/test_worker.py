@@ -0,0 +1,50 @@
+import pickle
+
+import pytest
+
+from datagears.engine.network import Network
+from datagears.engine.nodes import GearException
+from datagears.engine.worker import FunctionRef, execute, function_ref, resolve
+
+from . import *
+
+
+def fail(x: int) -> int:
+    return x // 0
+
+
+def test_function_ref():
+    """Test gear functions are shipped by reference."""
+    ref = function_ref(add)
+
+    assert ref == FunctionRef("test", "add")
+    assert ref.name == "add"
+    assert resolve(ref) is add
+    assert execute(ref, {"a": 1, "b": 2}) == 3
+
+    local = lambda: 1  # noqa: E731
+    assert function_ref(local) is local
+
+
+def test_plan_payload_excludes_graph():
+    """Test per task payload only carries the function reference and arguments."""
+    plan = Network("my-network", outputs=[my_out]).compile()
+    state = plan.new_run()
+    state.set_input({"a": 1, "b": 2, "c": 3})
+
+    gear_id = next(g for g in plan.gears if plan.gear(g).name == "add")
+    payload = pickle.dumps((plan.refs[gear_id], state.arguments(gear_id)))
+
+    assert len(payload) < 100
+    assert b"networkx" not in payload
+
+
+def test_gear_exception_from_worker():
+    """Test gear exceptions survive the trip back from worker processes."""
+    with pytest.raises(GearException) as exc_info:
+        Network("my-network", outputs=[fail]).run(x=1)
+
+    error = pickle.loads(pickle.dumps(exc_info.value))
+    assert error.gear == "fail"
+    assert error.params == {"x": 1}
+    assert isinstance(error.raised_exception, ZeroDivisionError)